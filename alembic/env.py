@@ -11,6 +11,7 @@ from alembic import context
 from app.core.config import settings
 from app.core.database import Base
 from app.models.book import Book  # Ensure models are imported so metadata is populated
+from app.models.import_job import ImportJob
 
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
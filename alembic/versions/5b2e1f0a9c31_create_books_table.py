@@ -0,0 +1,53 @@
+"""create books table
+
+Revision ID: 5b2e1f0a9c31
+Revises: 
+Create Date: 2026-10-17 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5b2e1f0a9c31'
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'books',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('title', sa.String(length=200), nullable=False),
+        sa.Column('author', sa.String(length=100), nullable=False),
+        sa.Column('description', sa.Text(), nullable=True),
+        sa.Column('year', sa.Integer(), nullable=True),
+        sa.Column('isbn', sa.String(length=20), nullable=True),
+        sa.Column('cover_url', sa.String(length=500), nullable=True),
+        sa.Column('language', sa.String(length=50), nullable=True),
+        sa.Column('page_count', sa.Integer(), nullable=True),
+        sa.Column(
+            'status',
+            sa.Enum('AVAILABLE', 'BORROWED', 'RESERVED', 'MAINTENANCE', name='bookstatus'),
+            nullable=False,
+        ),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=True),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index(op.f('ix_books_id'), 'books', ['id'], unique=False)
+    op.create_index(op.f('ix_books_title'), 'books', ['title'], unique=False)
+    op.create_index(op.f('ix_books_author'), 'books', ['author'], unique=False)
+    op.create_index(op.f('ix_books_isbn'), 'books', ['isbn'], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_books_isbn'), table_name='books')
+    op.drop_index(op.f('ix_books_author'), table_name='books')
+    op.drop_index(op.f('ix_books_title'), table_name='books')
+    op.drop_index(op.f('ix_books_id'), table_name='books')
+    op.drop_table('books')
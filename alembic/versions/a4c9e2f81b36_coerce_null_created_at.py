@@ -0,0 +1,45 @@
+"""keep books.created_at non-NULL
+
+Revision ID: a4c9e2f81b36
+Revises: f7b3c1d9a2e4
+Create Date: 2026-10-17 19:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a4c9e2f81b36'
+down_revision: Union[str, None] = 'f7b3c1d9a2e4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Keyset cursors on created_at skip rows without one. Triggers instead of
+    # NOT NULL: SQLite can only add the constraint by rebuilding the table.
+    op.execute("UPDATE books SET created_at = CURRENT_TIMESTAMP WHERE created_at IS NULL")
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+    op.execute(
+        "CREATE TRIGGER books_created_at_ai AFTER INSERT ON books "
+        "WHEN new.created_at IS NULL BEGIN "
+        "UPDATE books SET created_at = CURRENT_TIMESTAMP WHERE id = new.id; "
+        "END"
+    )
+    op.execute(
+        "CREATE TRIGGER books_created_at_au AFTER UPDATE OF created_at ON books "
+        "WHEN new.created_at IS NULL BEGIN "
+        "UPDATE books SET created_at = coalesce(old.created_at, CURRENT_TIMESTAMP) WHERE id = new.id; "
+        "END"
+    )
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+    op.execute("DROP TRIGGER IF EXISTS books_created_at_au")
+    op.execute("DROP TRIGGER IF EXISTS books_created_at_ai")
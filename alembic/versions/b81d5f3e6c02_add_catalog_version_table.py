@@ -0,0 +1,45 @@
+"""add catalog_version table
+
+Revision ID: b81d5f3e6c02
+Revises: a4c9e2f81b36
+Create Date: 2026-10-17 19:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b81d5f3e6c02'
+down_revision: Union[str, None] = 'a4c9e2f81b36'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'catalog_version',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('epoch', sa.String(length=16), nullable=False),
+        sa.Column('version', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+    op.execute("INSERT INTO catalog_version(id, epoch, version) VALUES (1, lower(hex(randomblob(8))), 0)")
+    for suffix, operation in (('ai', 'INSERT'), ('au', 'UPDATE'), ('ad', 'DELETE')):
+        op.execute(
+            f"CREATE TRIGGER catalog_version_{suffix} AFTER {operation} ON books BEGIN "
+            "UPDATE catalog_version SET version = version + 1 WHERE id = 1; "
+            "END"
+        )
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name == 'sqlite':
+        op.execute("DROP TRIGGER IF EXISTS catalog_version_ad")
+        op.execute("DROP TRIGGER IF EXISTS catalog_version_au")
+        op.execute("DROP TRIGGER IF EXISTS catalog_version_ai")
+    op.drop_table('catalog_version')
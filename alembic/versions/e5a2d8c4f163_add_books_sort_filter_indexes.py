@@ -0,0 +1,35 @@
+"""add books sort/filter indexes
+
+Revision ID: e5a2d8c4f163
+Revises: c3f7a91d2e48
+Create Date: 2026-10-17 13:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5a2d8c4f163'
+down_revision: Union[str, None] = 'c3f7a91d2e48'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_books_created_at_id', 'books', ['created_at', 'id'], unique=False)
+    op.create_index('ix_books_year_id', 'books', ['year', 'id'], unique=False)
+    op.create_index('ix_books_author_nocase_year', 'books', [sa.text('author COLLATE NOCASE'), 'year'], unique=False)
+    op.create_index('ix_books_status_created_at', 'books', ['status', 'created_at'], unique=False)
+    if op.get_bind().dialect.name == 'sqlite':
+        # Refresh planner statistics so the new indexes are picked up
+        op.execute("ANALYZE books")
+
+
+def downgrade() -> None:
+    op.drop_index('ix_books_status_created_at', table_name='books')
+    op.drop_index('ix_books_author_nocase_year', table_name='books')
+    op.drop_index('ix_books_year_id', table_name='books')
+    op.drop_index('ix_books_created_at_id', table_name='books')
@@ -0,0 +1,73 @@
+"""add book_stats aggregates table
+
+Revision ID: f7b3c1d9a2e4
+Revises: e5a2d8c4f163
+Create Date: 2026-10-17 15:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f7b3c1d9a2e4'
+down_revision: Union[str, None] = 'e5a2d8c4f163'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+DIMENSIONS = {
+    'status': "{row}.status",
+    'year': "coalesce(CAST({row}.year AS TEXT), '')",
+    'isbn': "CASE WHEN {row}.isbn IS NULL THEN '' ELSE 'with' END",
+    'language': "coalesce({row}.language, '')",
+}
+
+
+def _step(row: str, delta: int, dimensions: dict) -> str:
+    return "".join(
+        "INSERT INTO book_stats(dimension, key, count) "
+        f"VALUES ('{name}', {expression.format(row=row)}, {delta}) "
+        f"ON CONFLICT(dimension, key) DO UPDATE SET count = count + ({delta}); "
+        for name, expression in dimensions.items()
+    )
+
+
+def upgrade() -> None:
+    op.create_table(
+        'book_stats',
+        sa.Column('dimension', sa.String(length=20), nullable=False),
+        sa.Column('key', sa.String(length=50), nullable=False),
+        sa.Column('count', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('dimension', 'key'),
+        sqlite_with_rowid=False,
+    )
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+    with_total = {'total': "''", **DIMENSIONS}
+    op.execute(
+        "CREATE TRIGGER book_stats_ai AFTER INSERT ON books BEGIN " + _step("new", 1, with_total) + "END"
+    )
+    op.execute(
+        "CREATE TRIGGER book_stats_ad AFTER DELETE ON books BEGIN " + _step("old", -1, with_total) + "END"
+    )
+    op.execute(
+        "CREATE TRIGGER book_stats_au AFTER UPDATE OF status, year, isbn, language ON books BEGIN "
+        + _step("old", -1, DIMENSIONS) + _step("new", 1, DIMENSIONS) + "END"
+    )
+    # Backfill the counters from the rows already in `books`
+    for name, expression in with_total.items():
+        key = expression.format(row="books")
+        op.execute(
+            f"INSERT INTO book_stats(dimension, key, count) "
+            f"SELECT '{name}', {key}, count(*) FROM books GROUP BY {key}"
+        )
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name == 'sqlite':
+        op.execute("DROP TRIGGER IF EXISTS book_stats_au")
+        op.execute("DROP TRIGGER IF EXISTS book_stats_ad")
+        op.execute("DROP TRIGGER IF EXISTS book_stats_ai")
+    op.drop_table('book_stats')
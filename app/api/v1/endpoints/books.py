@@ -1,14 +1,36 @@
-from typing import List, Literal, Optional
+import uuid
+import zlib
+from typing import Any, AsyncIterator, Dict, List, Literal, Optional, Tuple
 
-from fastapi import APIRouter, Depends, HTTPException, Response, status, Query
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Request, Response, status, Query
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.database import get_db
-from app.schemas.book import BookCreate, BookResponse, BookUpdate
+from app.core.config import settings
+from app.core.database import ReadSessionLocal, get_db
+from app.core.etag import book_etag, collection_etag, etag_matches
+from app.schemas.book import (
+    BOOK_FACETS,
+    BOOK_FIELDS,
+    BookBatchGetRequest,
+    BookBatchGetResponse,
+    BookBulkResponse,
+    BookCreate,
+    BookImportReport,
+    BookResponse,
+    BookStatsResponse,
+    BookUpdate,
+    dump_book,
+    dump_book_list,
+)
 from app.services.book_service import BookService
+from app.services.import_service import BookImportService
 
 router = APIRouter()
 
+EXPORT_MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv; charset=utf-8"}
+JOB_ID_PATTERN = r"^[A-Za-z0-9_-]{1,64}$"
+
 async def get_book_service(db: AsyncSession = Depends(get_db)) -> BookService:
     return BookService(db)
 
@@ -19,9 +41,104 @@ async def create_book(
 ):
     return await service.create_book(book_in)
 
+@router.post("/bulk", response_model=BookBulkResponse)
+async def bulk_create_books(
+    books_in: List[Dict[str, Any]],
+    service: BookService = Depends(get_book_service)
+):
+    """Create many books at once; each item reports its new id or its error.
+
+    Items are ``BookCreate`` objects, validated one by one so a bad item
+    does not reject the whole batch.
+    """
+    if len(books_in) > settings.BULK_MAX_ITEMS:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"At most {settings.BULK_MAX_ITEMS} books per request",
+        )
+    return await service.bulk_create_books(books_in)
+
+@router.post("/batch-get", response_model=BookBatchGetResponse)
+async def batch_get_books(
+    request_in: BookBatchGetRequest,
+    service: BookService = Depends(get_book_service)
+):
+    """Fetch many books by id in one call; unknown ids are listed under ``missing``."""
+    if len(request_in.ids) > settings.BATCH_GET_MAX_IDS:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"At most {settings.BATCH_GET_MAX_IDS} ids per request",
+        )
+    books, missing = await service.get_books_by_ids(request_in.ids)
+    return {"books": books, "missing": missing}
+
+@router.post("/import", response_model=BookImportReport, status_code=status.HTTP_202_ACCEPTED)
+async def import_books(
+    request: Request,
+    background_tasks: BackgroundTasks,
+    format: Literal["csv", "ndjson"] = "csv",
+    job_id: Optional[str] = Query(None, pattern=JOB_ID_PATTERN),
+):
+    """Import a CSV/NDJSON file sent as the raw request body.
+
+    The upload is spooled to disk and imported in the background; poll
+    GET /import/{job_id} for progress and rejects.
+    """
+    importer = BookImportService()
+    job_id = job_id or uuid.uuid4().hex
+    if await importer.get_report(job_id) is not None:
+        raise HTTPException(status_code=409, detail="Import job already exists; resume it instead")
+    path = await importer.spool_upload(job_id, format, request.stream())
+    report = await importer.create_job(job_id, path, format)
+    background_tasks.add_task(importer.run, job_id)
+    return report
+
+@router.get("/import/{job_id}", response_model=BookImportReport)
+async def read_import(job_id: str):
+    report = await BookImportService().get_report(job_id)
+    if not report:
+        raise HTTPException(status_code=404, detail="Import job not found")
+    return report
+
+@router.post("/import/{job_id}/resume", response_model=BookImportReport, status_code=status.HTTP_202_ACCEPTED)
+async def resume_import(job_id: str, background_tasks: BackgroundTasks):
+    """Continue an interrupted import from its last committed chunk."""
+    importer = BookImportService()
+    report = await importer.get_report(job_id)
+    if not report:
+        raise HTTPException(status_code=404, detail="Import job not found")
+    if importer.is_running(job_id):
+        raise HTTPException(status_code=409, detail="Import job is already running")
+    background_tasks.add_task(importer.run, job_id)
+    return report
+
+FIELDS_DESCRIPTION = f"Comma-separated subset of fields to return: {', '.join(BOOK_FIELDS)}"
+
+def _parse_fields(fields: Optional[str]) -> Optional[Tuple[str, ...]]:
+    """Validate ?fields= and put it in response order; None means every field."""
+    if fields is None:
+        return None
+    requested = {name.strip() for name in fields.split(",") if name.strip()}
+    unknown = requested.difference(BOOK_FIELDS)
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(sorted(unknown))}")
+    if not requested:
+        raise HTTPException(status_code=400, detail="fields cannot be empty")
+    return tuple(name for name in BOOK_FIELDS if name in requested)
+
+def _parse_facets(facets: Optional[str]) -> Tuple[str, ...]:
+    requested = tuple(dict.fromkeys(name.strip() for name in (facets or "").split(",") if name.strip()))
+    unknown = [name for name in requested if name not in BOOK_FACETS]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown facets: {', '.join(unknown)}")
+    return requested
+
+def _not_modified(etag: str) -> Response:
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag, "Cache-Control": "no-cache"})
+
 @router.get("/", response_model=List[BookResponse])
 async def read_books(
-    response: Response,
+    request: Request,
     skip: int = Query(0, ge=0),
     limit: int = Query(20, ge=1, le=100),
     q: Optional[str] = Query(None, min_length=1, max_length=100, description="Search in title/author"),
@@ -31,11 +148,29 @@ async def read_books(
     year_max: Optional[int] = Query(None, ge=1000, le=2100),
     sort: Literal["title", "author", "year", "created_at"] = "created_at",
     order: Literal["asc", "desc"] = "desc",
+    cursor: Optional[str] = Query(None, max_length=512, description="Opaque X-Next-Cursor from a previous page; overrides skip"),
+    count: Literal["exact", "capped", "estimate", "none"] = Query(
+        "exact", description="How X-Total-Count is computed; capped reports e.g. 10000+, none omits it"
+    ),
+    fields: Optional[str] = Query(None, max_length=200, description=FIELDS_DESCRIPTION),
+    facets: Optional[str] = Query(
+        None,
+        max_length=100,
+        description=f"Comma-separated facets ({', '.join(BOOK_FACETS)}) counted over the filtered set, "
+        'returned as JSON in X-Facets; rare values are summed in an {"other": true} entry',
+    ),
     service: BookService = Depends(get_book_service),
 ):
     if year_min is not None and year_max is not None and year_min > year_max:
         raise HTTPException(status_code=400, detail="year_min cannot be greater than year_max")
-    books, total = await service.get_books(
+    selected = _parse_fields(fields)
+    facet_names = _parse_facets(facets)
+    # Taken before the query: a write landing meanwhile only makes the ETag stale, never wrong.
+    version = await service.get_catalog_version()
+    etag = collection_etag(request.query_params.multi_items(), version) if version is not None else None
+    if etag is not None and etag_matches(request.headers.get("If-None-Match"), etag):
+        return _not_modified(etag)
+    books, total, next_cursor = await service.get_books(
         skip=skip,
         limit=limit,
         q=q,
@@ -45,9 +180,64 @@ async def read_books(
         year_max=year_max,
         sort=sort,
         order=order,
+        cursor=cursor,
+        count=count,
+        fields=selected,
     )
-    response.headers["X-Total-Count"] = str(total)
-    return books
+    headers = {"ETag": etag, "Cache-Control": "no-cache"} if etag is not None else {}
+    if total is not None:
+        headers["X-Total-Count"] = total
+    if next_cursor:
+        headers["X-Next-Cursor"] = next_cursor
+    if facet_names:
+        headers["X-Facets"] = await service.get_facets(
+            facet_names, q=q, author=author, year=year, year_min=year_min, year_max=year_max
+        )
+    # Same bytes response_model would produce, minus its second validation pass
+    return Response(content=dump_book_list(books, selected), media_type="application/json", headers=headers)
+
+async def _gzip_stream(chunks: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    compressor = zlib.compressobj(wbits=16 + zlib.MAX_WBITS)
+    async for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+@router.get("/export", response_class=StreamingResponse)
+async def export_books(
+    format: Literal["ndjson", "csv"] = "ndjson",
+    gzip: bool = Query(False, description="Compress the stream (Content-Encoding: gzip)"),
+    q: Optional[str] = Query(None, min_length=1, max_length=100, description="Search in title/author"),
+    author: Optional[str] = Query(None, min_length=1, max_length=100),
+    year: Optional[int] = Query(None, ge=1000, le=2100),
+    year_min: Optional[int] = Query(None, ge=1000, le=2100),
+    year_max: Optional[int] = Query(None, ge=1000, le=2100),
+):
+    """Stream every book matching the list filters."""
+    if year_min is not None and year_max is not None and year_min > year_max:
+        raise HTTPException(status_code=400, detail="year_min cannot be greater than year_max")
+
+    async def body() -> AsyncIterator[bytes]:
+        # The request-scoped session is closed before streaming starts, so own one here.
+        async with ReadSessionLocal() as session:
+            chunks = BookService(session).export_books(
+                format=format, q=q, author=author, year=year, year_min=year_min, year_max=year_max
+            )
+            async for chunk in chunks:
+                yield chunk
+
+    headers = {"Content-Disposition": f'attachment; filename="books.{format}"'}
+    stream = body()
+    if gzip:
+        headers["Content-Encoding"] = "gzip"
+        stream = _gzip_stream(stream)
+    return StreamingResponse(stream, media_type=EXPORT_MEDIA_TYPES[format], headers=headers)
+
+@router.get("/stats", response_model=BookStatsResponse)
+async def read_stats(service: BookService = Depends(get_book_service)):
+    """Catalog-wide totals, read from counters kept up to date on every write."""
+    return await service.get_stats()
 
 @router.get("/lookup/{isbn}", response_model=dict)
 async def lookup_isbn(isbn: str, service: BookService = Depends(get_book_service)):
@@ -58,10 +248,32 @@ async def lookup_isbn(isbn: str, service: BookService = Depends(get_book_service
     return data
 
 @router.get("/{book_id}", response_model=BookResponse)
-async def read_book(book_id: int, service: BookService = Depends(get_book_service)):
-    book = await service.get_book(book_id)
+async def read_book(
+    book_id: int,
+    request: Request,
+    response: Response,
+    fields: Optional[str] = Query(None, max_length=200, description=FIELDS_DESCRIPTION),
+    service: BookService = Depends(get_book_service),
+):
+    selected = _parse_fields(fields)
+    if_none_match = request.headers.get("If-None-Match")
+    if if_none_match:
+        # Revalidation only reads the timestamps, not the whole row
+        etag = await service.get_book_etag(book_id, fields=selected)
+        if etag is not None and etag_matches(if_none_match, etag):
+            return _not_modified(etag)
+    book = await service.get_book(book_id, fields=selected)
     if not book:
         raise HTTPException(status_code=404, detail="Book not found")
+    etag = book_etag(book.id, book.created_at, book.updated_at, fields=selected)
+    if selected is not None:
+        return Response(
+            content=dump_book(book, selected),
+            media_type="application/json",
+            headers={"ETag": etag, "Cache-Control": "no-cache"},
+        )
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = "no-cache"
     return book
 
 @router.put("/{book_id}", response_model=BookResponse)
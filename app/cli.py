@@ -0,0 +1,67 @@
+"""Command line tools, e.g. ``python -m app.cli import catalogue.csv``."""
+import argparse
+import asyncio
+import hashlib
+import os
+import sys
+from typing import List, Optional
+
+from app.core.config import settings
+from app.core.database import Base, dispose_engines, engine
+from app.schemas.book import BookImportReport
+from app.services.import_service import BookImportService
+
+
+def _default_job_id(path: str) -> str:
+    # Same file, same job: rerunning the command resumes the previous run.
+    stat = os.stat(path)
+    return hashlib.sha1(f"{os.path.abspath(path)}:{stat.st_size}".encode()).hexdigest()[:16]
+
+
+def _print_progress(report: BookImportReport) -> None:
+    print(
+        f"\r{report.rows_read} rows read, {report.rows_imported} imported, "
+        f"{report.rows_rejected} rejected ({report.rows_per_second:.0f} rows/s)",
+        end="",
+        file=sys.stderr,
+        flush=True,
+    )
+
+
+async def import_file(path: str, format: str, job_id: Optional[str], chunk_size: Optional[int]) -> int:
+    if settings.DB_AUTO_CREATE:
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+
+    importer = BookImportService(chunk_size=chunk_size, on_progress=_print_progress)
+    job_id = job_id or _default_job_id(path)
+    existing = await importer.get_report(job_id)
+    if existing is None:
+        await importer.create_job(job_id, os.path.abspath(path), format)
+    elif existing.byte_offset:
+        print(f"Resuming import {job_id} at byte {existing.byte_offset}", file=sys.stderr)
+
+    report = await importer.run(job_id)
+    await dispose_engines()
+    print(file=sys.stderr)
+    print(report.model_dump_json(indent=2))
+    return 0 if report.status == "completed" else 1
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m app.cli")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    importer = commands.add_parser("import", help="Import books from a CSV or NDJSON file")
+    importer.add_argument("path")
+    importer.add_argument("--format", choices=["csv", "ndjson"])
+    importer.add_argument("--job-id", help="Checkpoint key; defaults to one derived from the file")
+    importer.add_argument("--chunk-size", type=int, help="Rows per committed chunk")
+
+    args = parser.parse_args(argv)
+    format = args.format or ("csv" if args.path.lower().endswith(".csv") else "ndjson")
+    return asyncio.run(import_file(args.path, format, args.job_id, args.chunk_size))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,3 +1,5 @@
+from typing import Optional
+
 from pydantic_settings import BaseSettings
 
 
@@ -10,9 +12,64 @@ class Settings(BaseSettings):
     # Database
     DATABASE_URL: str = "sqlite+aiosqlite:///./library.db"
     DB_AUTO_CREATE: bool = True
+    DB_READ_POOL_SIZE: int = 8  # read-only connections; writes use a single one
+
+    # Group commit: writes arriving within the window share one transaction
+    WRITE_GROUP_COMMIT: bool = False
+    WRITE_GROUP_WINDOW_MS: float = 2.0
+    WRITE_GROUP_MAX_OPS: int = 64
+
+    # SQLite connection tuning: a preset ("durable", "throughput" or "" for
+    # SQLite's defaults) plus per-PRAGMA overrides applied on connect
+    SQLITE_PROFILE: str = "durable"
+    SQLITE_JOURNAL_MODE: Optional[str] = None
+    SQLITE_SYNCHRONOUS: Optional[str] = None
+    SQLITE_CACHE_SIZE: Optional[int] = None
+    SQLITE_MMAP_SIZE: Optional[int] = None
+    SQLITE_TEMP_STORE: Optional[str] = None
+    SQLITE_BUSY_TIMEOUT: Optional[int] = None  # milliseconds
+
+    # Listing: fetch the X-Total-Count with the page via COUNT(*) OVER ()
+    LIST_WINDOW_COUNT: bool = True
+    LIST_COUNT_CAP: int = 10000  # count=capped reports "10000+" beyond this
+    BATCH_GET_MAX_IDS: int = 1000  # ids per POST /books/batch-get
+    # ?facets= results per filter set; entries also die with the next write
+    FACET_CACHE_MAXSIZE: int = 1000
+    FACET_CACHE_TTL: float = 300.0
+    # X-Facets keeps the top values per facet and sums the rest into "other",
+    # folding further if needed to stay under the byte budget (proxies cap headers at ~8 KB)
+    FACET_MAX_VALUES: int = 10
+    FACET_HEADER_MAX_BYTES: int = 4096
+
+    # Bulk ingestion
+    BULK_MAX_ITEMS: int = 10000
+    BULK_CHUNK_SIZE: int = 500
+    EXPORT_CHUNK_SIZE: int = 5000
+    IMPORT_DIR: str = "./imports"
+    IMPORT_CHUNK_SIZE: int = 1000
+    IMPORT_QUEUE_DEPTH: int = 4  # parsed chunks buffered ahead of the writer
+    IMPORT_MAX_REPORTED_REJECTS: int = 100
+
+    # Outbound HTTP (OpenLibrary lookups)
+    OPENLIBRARY_URL: str = "https://openlibrary.org"
+    HTTP_TIMEOUT: float = 5.0
+    HTTP_CONNECT_TIMEOUT: float = 3.0
+    HTTP_MAX_CONNECTIONS: int = 20
+    HTTP_MAX_KEEPALIVE_CONNECTIONS: int = 10
+    HTTP_KEEPALIVE_EXPIRY: float = 30.0
+    HTTP_HTTP2: bool = False  # requires the optional `h2` package (httpx[http2])
+
+    # ISBN metadata cache (seconds); misses are cached for a shorter time
+    ISBN_CACHE_MAXSIZE: int = 10000
+    ISBN_CACHE_TTL: float = 86400.0
+    ISBN_CACHE_NEGATIVE_TTL: float = 600.0
 
     # Observability
     LOG_LEVEL: str = "INFO"
+    METRICS_ENABLED: bool = True  # GET /metrics and the timings behind it
+    # Log statements slower than this (0 disables) with their EXPLAIN QUERY PLAN
+    SLOW_QUERY_MS: float = 200.0
+    SLOW_QUERY_MAX_PLANS: int = 500  # distinct statement shapes whose plan is kept
     
     class Config:
         case_sensitive = True
@@ -1,16 +1,87 @@
+import time
+
+from sqlalchemy import event
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
 from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 from app.core.config import settings
+from app.core.metrics import db_pool_checkout_wait, instrument_engine
+from app.core.slow_query import SlowQueryLog
+from app.core.sqlite import apply_sqlite_pragmas, sqlite_pragmas
+from app.core.writer import WriteQueue
 
-# Create Async Engine
-engine = create_async_engine(
-    settings.DATABASE_URL,
-    echo=False,
-    future=True,
-    connect_args={"check_same_thread": False} if "sqlite" in settings.DATABASE_URL else {}
-)
+_is_sqlite = "sqlite" in settings.DATABASE_URL
+_is_sqlite_file = _is_sqlite and ":memory:" not in settings.DATABASE_URL
+
+
+def _timed_pool(name: str):
+    """AsyncAdaptedQueuePool that records how long each checkout waited, as ``name``."""
+
+    class TimedQueuePool(AsyncAdaptedQueuePool):
+        def _do_get(self):
+            started = time.perf_counter()
+            try:
+                return super()._do_get()
+            finally:
+                db_pool_checkout_wait.observe(time.perf_counter() - started, name)
+
+    return TimedQueuePool
+
+
+def _create_engine(**kwargs):
+    return create_async_engine(
+        settings.DATABASE_URL,
+        echo=False,
+        future=True,
+        connect_args={"check_same_thread": False} if _is_sqlite else {},
+        **kwargs,
+    )
+
+
+# SQLite allows one writer at a time, so writes share a single connection
+# (fed by write_queue) while reads get their own pool; in WAL mode readers
+# never wait on the writer. File-backed SQLite defaults to NullPool, which
+# would reconnect and re-run the PRAGMAs for every session.
+if _is_sqlite_file:
+    _pool = _timed_pool if settings.METRICS_ENABLED else lambda name: AsyncAdaptedQueuePool
+    engine = _create_engine(poolclass=_pool("write"), pool_size=1, max_overflow=0)
+    read_engine = _create_engine(
+        poolclass=_pool("read"), pool_size=settings.DB_READ_POOL_SIZE, max_overflow=0
+    )
+else:
+    engine = read_engine = _create_engine()
+
+if settings.METRICS_ENABLED:
+    instrument_engine(engine.sync_engine, "write")
+    if read_engine is not engine:
+        instrument_engine(read_engine.sync_engine, "read")
+
+slow_query_log = SlowQueryLog(settings.SLOW_QUERY_MS, max_plans=settings.SLOW_QUERY_MAX_PLANS)
+if settings.SLOW_QUERY_MS > 0:
+    slow_query_log.install(engine.sync_engine)
+    if read_engine is not engine:
+        slow_query_log.install(read_engine.sync_engine)
+
+if _is_sqlite:
+    _pragmas = sqlite_pragmas()
 
-# Create Session Factory
+    @event.listens_for(engine.sync_engine, "connect")
+    def _configure_sqlite(dbapi_connection, connection_record):
+        apply_sqlite_pragmas(dbapi_connection, _pragmas)
+        # Let SQLAlchemy emit BEGIN itself so SAVEPOINTs (group commit) nest
+        # inside the transaction instead of committing it on RELEASE.
+        dbapi_connection.isolation_level = None
+
+    @event.listens_for(engine.sync_engine, "begin")
+    def _begin_sqlite(conn):
+        conn.exec_driver_sql("BEGIN")
+
+    if read_engine is not engine:
+        @event.listens_for(read_engine.sync_engine, "connect")
+        def _configure_sqlite_reader(dbapi_connection, connection_record):
+            apply_sqlite_pragmas(dbapi_connection, {**_pragmas, "query_only": "ON"})
+
+# Create Session Factories: writer sessions and read-only sessions
 AsyncSessionLocal = sessionmaker(
     bind=engine,
     class_=AsyncSession,
@@ -18,12 +89,34 @@ AsyncSessionLocal = sessionmaker(
     autoflush=False,
 )
 
+ReadSessionLocal = sessionmaker(
+    bind=read_engine,
+    class_=AsyncSession,
+    expire_on_commit=False,
+    autoflush=False,
+)
+
+# Serialized writes through the writer connection
+write_queue = WriteQueue(
+    AsyncSessionLocal,
+    group_commit=settings.WRITE_GROUP_COMMIT,
+    group_window=settings.WRITE_GROUP_WINDOW_MS / 1000,
+    group_max_ops=settings.WRITE_GROUP_MAX_OPS,
+)
+
 Base = declarative_base()
 
-# Dependency for API
+# Dependency for API: reads use the session, writes go through write_queue
 async def get_db():
-    async with AsyncSessionLocal() as session:
+    async with ReadSessionLocal() as session:
         try:
             yield session
         finally:
             await session.close()
+
+
+async def dispose_engines() -> None:
+    await write_queue.close()
+    await engine.dispose()
+    if read_engine is not engine:
+        await read_engine.dispose()
@@ -0,0 +1,42 @@
+import hashlib
+from datetime import datetime
+from typing import Iterable, Optional, Sequence, Tuple
+
+# (epoch, version) of the catalog_version row, bumped by every change to books
+CatalogVersion = Tuple[str, int]
+
+
+def collection_etag(params: Iterable[Tuple[str, str]], version: CatalogVersion) -> str:
+    """Strong ETag of a collection response for these query parameters at ``version``."""
+    query = "&".join(f"{name}={value}" for name, value in sorted(params))
+    epoch, number = version
+    digest = hashlib.sha1(f"{epoch}:{number}:{query}".encode()).hexdigest()[:20]
+    return f'"c-{digest}"'
+
+
+def book_etag(
+    book_id: int,
+    created_at: Optional[datetime],
+    updated_at: Optional[datetime],
+    fields: Optional[Sequence[str]] = None,
+) -> str:
+    """Strong ETag of one book, which changes whenever the row is updated.
+
+    A sparse fieldset is a different representation, so ``fields`` is
+    part of the tag.
+    """
+    stamp = f"{book_id}:{created_at and created_at.isoformat()}:{updated_at and updated_at.isoformat()}"
+    if fields is not None:
+        stamp += ":" + ",".join(fields)
+    return f'"b{book_id}-{hashlib.sha1(stamp.encode()).hexdigest()[:16]}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    # If-None-Match uses the weak comparison, so a W/ prefix is ignored.
+    candidates = (tag.strip().removeprefix("W/") for tag in if_none_match.split(","))
+    return etag in candidates
+
@@ -0,0 +1,54 @@
+import base64
+import json
+from dataclasses import dataclass
+from typing import Any
+
+# SQLite INTEGER range; larger ids and keys overflow the driver
+INT64_MIN, INT64_MAX = -2**63, 2**63 - 1
+# Sorts on a non-null text column; "year" is an integer that may be NULL
+STRING_SORTS = ("title", "author", "created_at")
+
+
+@dataclass(frozen=True)
+class Cursor:
+    """Position of the last row served, used to seek the next page."""
+
+    sort: str
+    order: str
+    key: Any
+    id: int
+
+
+def encode_cursor(cursor: Cursor) -> str:
+    payload = {"s": cursor.sort, "o": cursor.order, "k": cursor.key, "i": cursor.id}
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def _is_int64(value: Any) -> bool:
+    # bool is an int subclass, but never a valid key or id
+    return isinstance(value, int) and not isinstance(value, bool) and INT64_MIN <= value <= INT64_MAX
+
+
+def decode_cursor(token: str) -> Cursor:
+    """Decode a cursor, raising ValueError if it is malformed.
+
+    Cursors are unsigned base64 JSON: a client can edit one, so every field
+    is checked to be a value the sort's column can hold before it reaches
+    a query.
+    """
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        payload = json.loads(raw)
+        cursor = Cursor(sort=payload["s"], order=payload["o"], key=payload["k"], id=payload["i"])
+    except (ValueError, TypeError, KeyError) as exc:
+        raise ValueError("Invalid cursor") from exc
+    if not _is_int64(cursor.id) or cursor.order not in ("asc", "desc"):
+        raise ValueError("Invalid cursor")
+    if cursor.sort == "year":
+        valid_key = cursor.key is None or _is_int64(cursor.key)
+    else:
+        valid_key = cursor.sort in STRING_SORTS and isinstance(cursor.key, str)
+    if not valid_key:
+        raise ValueError("Invalid cursor")
+    return cursor
@@ -0,0 +1,107 @@
+import hashlib
+import logging
+import re
+import time
+from collections import OrderedDict
+from typing import Any, Optional, Sequence
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+_STARTED = "slow_query_started"
+_EXPLAINABLE = ("SELECT", "INSERT", "UPDATE", "DELETE", "WITH", "REPLACE")
+# Expanded IN lists: "?, ?, ?" of any length is one shape.
+_PLACEHOLDER_RUN = re.compile(r"\?(?:\s*,\s*\?)+")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def statement_shape(statement: str) -> str:
+    """The statement with IN lists collapsed and whitespace normalized."""
+    return _WHITESPACE.sub(" ", _PLACEHOLDER_RUN.sub("?, ...", statement)).strip()
+
+
+def redact(parameters: Any) -> Any:
+    """Parameter types and sizes instead of values, so no data reaches the log."""
+    if isinstance(parameters, dict):
+        return {name: redact(value) for name, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        return [redact(value) for value in parameters]
+    if parameters is None:
+        return None
+    if isinstance(parameters, (str, bytes)):
+        return f"<{type(parameters).__name__}:{len(parameters)}>"
+    return f"<{type(parameters).__name__}>"
+
+
+class SlowQueryLog:
+    """Log statements slower than ``threshold_ms`` with their query plan.
+
+    ``EXPLAIN QUERY PLAN`` runs once per statement shape (SQLite only) on
+    the connection that ran the statement; the plan is kept for the
+    ``max_plans`` most recent shapes and repeated on every later slow run
+    of that shape. A threshold of 0 or less disables the log.
+    """
+
+    def __init__(self, threshold_ms: float, max_plans: int = 500):
+        self.threshold_ms = threshold_ms
+        self.max_plans = max_plans
+        self._plans: "OrderedDict[str, str]" = OrderedDict()
+        self.explains = 0
+
+    def install(self, engine: Engine) -> None:
+        event.listen(engine, "before_cursor_execute", self._before)
+        event.listen(engine, "after_cursor_execute", self._after)
+        event.listen(engine, "handle_error", self._error)
+
+    def _before(self, conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault(_STARTED, []).append(time.perf_counter())
+
+    def _error(self, context):
+        started = context.connection.info.get(_STARTED) if context.connection is not None else None
+        if started:
+            started.pop()
+
+    def _after(self, conn, cursor, statement, parameters, context, executemany):
+        started = conn.info.get(_STARTED)
+        if not started:
+            return
+        elapsed_ms = (time.perf_counter() - started.pop()) * 1000
+        if self.threshold_ms <= 0 or elapsed_ms < self.threshold_ms:
+            return
+        shape = statement_shape(statement)
+        shape_id = hashlib.sha1(shape.encode()).hexdigest()[:12]
+        plan = self._plan(conn, shape_id, statement, parameters[0] if executemany and parameters else parameters)
+        logger.warning(
+            "slow query %.1f ms shape=%s plan=[%s] params=%s sql=%s",
+            elapsed_ms,
+            shape_id,
+            plan or "-",
+            redact(parameters),
+            shape,
+        )
+
+    def _plan(self, conn, shape_id: str, statement: str, parameters: Optional[Sequence]) -> Optional[str]:
+        plan = self._plans.get(shape_id)
+        if plan is not None:
+            self._plans.move_to_end(shape_id)
+            return plan
+        if conn.dialect.name != "sqlite" or not statement.lstrip()[:7].upper().startswith(_EXPLAINABLE):
+            return None
+        # A raw DB-API cursor: the EXPLAIN is neither timed nor logged itself
+        cursor = conn.connection.dbapi_connection.cursor()
+        try:
+            cursor.execute(f"EXPLAIN QUERY PLAN {statement}", parameters or ())
+            rows = cursor.fetchall()
+        except Exception as exc:
+            plan = f"unavailable: {exc}"
+        else:
+            plan = "; ".join(row[-1] for row in rows)
+        finally:
+            cursor.close()
+        self.explains += 1
+        self._plans[shape_id] = plan
+        while len(self._plans) > self.max_plans:
+            self._plans.popitem(last=False)
+        return plan
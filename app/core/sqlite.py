@@ -0,0 +1,54 @@
+from typing import Any, Dict, Optional
+
+from app.core.config import settings
+
+# PRAGMA presets selected by SQLITE_PROFILE. Both use WAL so readers never
+# block on the writer; "durable" still fsyncs every commit, "throughput"
+# only at checkpoints (a power loss may drop the last commits, never corrupt).
+SQLITE_PROFILES: Dict[str, Dict[str, Any]] = {
+    "durable": {
+        "journal_mode": "WAL",
+        "synchronous": "FULL",
+        "cache_size": -16000,  # negative = KiB
+        "mmap_size": 0,
+        "temp_store": "MEMORY",
+        "busy_timeout": 5000,
+    },
+    "throughput": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "cache_size": -64000,
+        "mmap_size": 256 * 1024 * 1024,
+        "temp_store": "MEMORY",
+        "busy_timeout": 5000,
+    },
+}
+
+
+def sqlite_pragmas(profile: Optional[str] = None) -> Dict[str, Any]:
+    """Resolve a profile plus the individual SQLITE_* overrides into PRAGMAs."""
+    if profile is None:
+        profile = settings.SQLITE_PROFILE
+    if profile and profile not in SQLITE_PROFILES:
+        raise ValueError(f"Unknown SQLITE_PROFILE {profile!r}; expected one of {sorted(SQLITE_PROFILES)}")
+    pragmas = dict(SQLITE_PROFILES.get(profile, {}))
+    overrides = {
+        "journal_mode": settings.SQLITE_JOURNAL_MODE,
+        "synchronous": settings.SQLITE_SYNCHRONOUS,
+        "cache_size": settings.SQLITE_CACHE_SIZE,
+        "mmap_size": settings.SQLITE_MMAP_SIZE,
+        "temp_store": settings.SQLITE_TEMP_STORE,
+        "busy_timeout": settings.SQLITE_BUSY_TIMEOUT,
+    }
+    pragmas.update({name: value for name, value in overrides.items() if value is not None})
+    return pragmas
+
+
+def apply_sqlite_pragmas(dbapi_connection, pragmas: Dict[str, Any]) -> None:
+    """Run the PRAGMAs on a freshly opened DBAPI connection."""
+    cursor = dbapi_connection.cursor()
+    try:
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+    finally:
+        cursor.close()
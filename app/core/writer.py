@@ -0,0 +1,153 @@
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, List, Optional, Tuple, TypeVar
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+WriteJob = Callable[[AsyncSession], Awaitable[Any]]
+QueuedJob = Tuple[WriteJob, asyncio.Future]
+
+
+class WriteQueue:
+    """Run write jobs one at a time on the writer connection.
+
+    A single worker task takes jobs from an asyncio queue; each job gets a
+    fresh writer session and is committed on success or rolled back on
+    error, and its outcome is handed back to the caller that submitted it.
+    The worker is started lazily on the running event loop.
+
+    With ``group_commit`` the worker gathers the jobs that arrive within
+    ``group_window`` seconds of the first one (at most ``group_max_ops``)
+    and runs them in one transaction, each inside its own SAVEPOINT, so a
+    failing job is rolled back alone and the group pays for one commit.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], AsyncSession],
+        *,
+        group_commit: bool = False,
+        group_window: float = 0.002,
+        group_max_ops: int = 64,
+    ):
+        self.session_factory = session_factory
+        self.group_commit = group_commit
+        self.group_window = group_window
+        self.group_max_ops = max(1, group_max_ops)
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+
+    async def submit(self, job: Callable[[AsyncSession], Awaitable[T]]) -> T:
+        future = asyncio.get_running_loop().create_future()
+        self._ensure_worker().put_nowait((job, future))
+        return await future
+
+    def pending(self) -> int:
+        return self._queue.qsize() if self._queue is not None else 0
+
+    async def close(self) -> None:
+        """Let queued jobs finish, then stop the worker."""
+        worker, queue = self._worker, self._queue
+        self._worker = self._queue = None
+        if worker is None or worker.done() or worker.get_loop() is not asyncio.get_running_loop():
+            return
+        queue.put_nowait(None)
+        await worker
+
+    def _ensure_worker(self) -> asyncio.Queue:
+        loop = asyncio.get_running_loop()
+        if self._worker is None or self._worker.done() or self._worker.get_loop() is not loop:
+            self._queue = asyncio.Queue()
+            self._worker = loop.create_task(self._run(self._queue))
+        return self._queue
+
+    async def _run(self, queue: asyncio.Queue) -> None:
+        while True:
+            item: Optional[QueuedJob] = await queue.get()
+            if item is None:
+                return
+            batch = [item]
+            stopping = False
+            if self.group_commit:
+                stopping = await self._gather(queue, batch)
+            batch = [(job, future) for job, future in batch if not future.cancelled()]
+            try:
+                if len(batch) > 1:
+                    await self._run_group(batch)
+                elif batch:
+                    await self._run_one(*batch[0])
+            except Exception as exc:
+                # E.g. a failed ROLLBACK on a lost connection: fail this batch, keep serving the queue
+                logger.exception("write batch of %d job(s) failed", len(batch))
+                for _, future in batch:
+                    _settle(future, error=exc)
+            if stopping:
+                return
+
+    async def _gather(self, queue: asyncio.Queue, batch: List[QueuedJob]) -> bool:
+        """Add jobs arriving within the window to ``batch``; True if close() was called."""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.group_window
+        while len(batch) < self.group_max_ops:
+            if queue.empty():
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+            else:
+                item = queue.get_nowait()
+            if item is None:
+                return True
+            batch.append(item)
+        return False
+
+    async def _run_one(self, job: WriteJob, future: asyncio.Future) -> None:
+        async with self.session_factory() as session:
+            try:
+                result = await job(session)
+                await session.commit()
+            except Exception as exc:
+                await session.rollback()
+                _settle(future, error=exc)
+            else:
+                _settle(future, result=result)
+
+    async def _run_group(self, batch: List[QueuedJob]) -> None:
+        outcomes = []
+        async with self.session_factory() as session:
+            for job, future in batch:
+                try:
+                    async with session.begin_nested():
+                        outcomes.append((future, await job(session), None))
+                except Exception as exc:
+                    outcomes.append((future, None, exc))
+            try:
+                await session.commit()
+            except Exception:
+                await session.rollback()
+                failed = True
+            else:
+                failed = False
+        if failed:
+            # The group commit itself failed: give every job its own transaction.
+            for job, future in batch:
+                await self._run_one(job, future)
+            return
+        for future, result, error in outcomes:
+            _settle(future, result=result, error=error)
+
+
+def _settle(future: asyncio.Future, result: Any = None, error: Optional[BaseException] = None) -> None:
+    if future.done():
+        return
+    if error is not None:
+        future.set_exception(error)
+    else:
+        future.set_result(result)
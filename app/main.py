@@ -4,14 +4,17 @@ from contextlib import asynccontextmanager
 from pathlib import Path
 
 from fastapi import FastAPI, Request
-from fastapi.responses import HTMLResponse
+from fastapi.responses import HTMLResponse, PlainTextResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 
 from app.api.v1.router import api_router
 from app.core.config import settings
-from app.core.database import Base, engine
+from app.core.database import Base, dispose_engines, engine
+from app.core.http import close_http_client, get_http_client
 from app.core.logging import setup_logging
+from app.core.metrics import http_request_duration, http_requests_in_flight, registry
+from app.services.book_service import isbn_cache
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
@@ -19,9 +22,11 @@ async def lifespan(app: FastAPI):
     if settings.DB_AUTO_CREATE:
         async with engine.begin() as conn:
             await conn.run_sync(Base.metadata.create_all)
+    get_http_client()
     yield
     # Shutdown
-    await engine.dispose()
+    await close_http_client()
+    await dispose_engines()
 
 app = FastAPI(
     title=settings.PROJECT_NAME,
@@ -41,9 +46,21 @@ app.include_router(api_router, prefix=settings.API_V1_STR)
 async def request_context_middleware(request: Request, call_next):
     request_id = request.headers.get("X-Request-Id", str(uuid.uuid4()))
     start_time = time.perf_counter()
-    response = await call_next(request)
+    http_requests_in_flight.inc()
+    status_code = 500
+    try:
+        response = await call_next(request)
+        status_code = response.status_code
+    finally:
+        elapsed = time.perf_counter() - start_time
+        http_requests_in_flight.dec()
+        if settings.METRICS_ENABLED:
+            # The route template, not the raw path, keeps label cardinality bounded
+            route = request.scope.get("route")
+            route_path = getattr(route, "path", "<unmatched>")
+            http_request_duration.observe(elapsed, request.method, route_path, str(status_code))
     response.headers["X-Request-Id"] = request_id
-    response.headers["X-Process-Time"] = f"{time.perf_counter() - start_time:.4f}"
+    response.headers["X-Process-Time"] = f"{elapsed:.4f}"
     return response
 
 @app.get("/", response_class=HTMLResponse, include_in_schema=False)
@@ -60,3 +77,13 @@ async def api_root():
 @app.get("/health", tags=["health"])
 async def health():
     return {"status": "ok", "version": settings.VERSION}
+
+@app.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+async def metrics():
+    if not settings.METRICS_ENABLED:
+        return PlainTextResponse("Metrics are disabled", status_code=404)
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+@app.get("/health/cache", tags=["health"])
+async def cache_health():
+    return {"isbn_lookup": isbn_cache.stats()}
@@ -1,9 +1,15 @@
-from sqlalchemy import Column, Integer, String, DateTime, Text, Enum as SQLEnum
+from datetime import datetime, timezone
+from sqlalchemy import Column, Integer, String, DateTime, Table, Text, Enum as SQLEnum, DDL, Index, event, text
 import enum
-from sqlalchemy.sql import func
+from sqlalchemy.sql import column, func, table
 from app.core.database import Base
 
 
+def _utcnow() -> datetime:
+    # Naive UTC, the same form SQLite's CURRENT_TIMESTAMP stores
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
 class BookStatus(str, enum.Enum):
     AVAILABLE = "available"
     BORROWED = "borrowed"
@@ -25,5 +31,132 @@ class Book(Base):
     page_count = Column(Integer, nullable=True)
     status = Column(SQLEnum(BookStatus), default=BookStatus.AVAILABLE, nullable=False)
     
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    # Stamped in Python for sub-second precision: per-book ETags derive from
+    # both, and SQLite hands a deleted newest row's id to the next insert.
+    # The server default covers rows inserted outside the ORM.
+    created_at = Column(DateTime(timezone=True), default=_utcnow, server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=_utcnow)
+
+    # Composite indexes for the list sorts (id breaks ties) and filters
+    __table_args__ = (
+        Index("ix_books_created_at_id", "created_at", "id"),
+        Index("ix_books_year_id", "year", "id"),
+        Index("ix_books_author_nocase_year", text("author COLLATE NOCASE"), "year"),
+        Index("ix_books_status_created_at", "status", "created_at"),
+    )
+
+
+# SQLite FTS5 index over title/author, kept in sync with `books` by triggers.
+# The trigram tokenizer matches arbitrary case-insensitive substrings, the same
+# semantics as the `%q%` LIKE it replaces, but served from the index.
+books_fts = table("books_fts", column("rowid", Integer), column("books_fts"))
+
+BOOKS_FTS_DDL = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS books_fts USING fts5("
+    "title, author, content='books', content_rowid='id', tokenize='trigram')",
+    "CREATE TRIGGER IF NOT EXISTS books_fts_ai AFTER INSERT ON books BEGIN "
+    "INSERT INTO books_fts(rowid, title, author) VALUES (new.id, new.title, new.author); "
+    "END",
+    "CREATE TRIGGER IF NOT EXISTS books_fts_ad AFTER DELETE ON books BEGIN "
+    "INSERT INTO books_fts(books_fts, rowid, title, author) VALUES ('delete', old.id, old.title, old.author); "
+    "END",
+    "CREATE TRIGGER IF NOT EXISTS books_fts_au AFTER UPDATE OF title, author ON books BEGIN "
+    "INSERT INTO books_fts(books_fts, rowid, title, author) VALUES ('delete', old.id, old.title, old.author); "
+    "INSERT INTO books_fts(rowid, title, author) VALUES (new.id, new.title, new.author); "
+    "END",
+)
+
+for _statement in BOOKS_FTS_DDL:
+    event.listen(Book.__table__, "after_create", DDL(_statement).execute_if(dialect="sqlite"))
+event.listen(
+    Book.__table__, "before_drop", DDL("DROP TABLE IF EXISTS books_fts").execute_if(dialect="sqlite")
+)
+
+
+# The created_at keyset cursor assumes the column is never NULL. The server
+# default fills it on insert; these put it back when a write sets NULL.
+BOOKS_CREATED_AT_DDL = (
+    "CREATE TRIGGER IF NOT EXISTS books_created_at_ai AFTER INSERT ON books "
+    "WHEN new.created_at IS NULL BEGIN "
+    "UPDATE books SET created_at = CURRENT_TIMESTAMP WHERE id = new.id; "
+    "END",
+    "CREATE TRIGGER IF NOT EXISTS books_created_at_au AFTER UPDATE OF created_at ON books "
+    "WHEN new.created_at IS NULL BEGIN "
+    "UPDATE books SET created_at = coalesce(old.created_at, CURRENT_TIMESTAMP) WHERE id = new.id; "
+    "END",
+)
+
+for _statement in BOOKS_CREATED_AT_DDL:
+    event.listen(Book.__table__, "after_create", DDL(_statement).execute_if(dialect="sqlite"))
+
+
+# Catalog aggregates for GET /books/stats: one counter per (dimension, key),
+# kept in step with `books` by triggers in the writing transaction. NULL
+# values are counted under the key ''; "total" has the single key ''.
+book_stats = Table(
+    "book_stats",
+    Base.metadata,
+    Column("dimension", String(20), primary_key=True),
+    Column("key", String(50), primary_key=True),
+    Column("count", Integer, nullable=False),
+    sqlite_with_rowid=False,
+)
+
+BOOK_STATS_DIMENSIONS = {
+    "status": "{row}.status",
+    "year": "coalesce(CAST({row}.year AS TEXT), '')",
+    "isbn": "CASE WHEN {row}.isbn IS NULL THEN '' ELSE 'with' END",
+    "language": "coalesce({row}.language, '')",
+}
+
+
+def _book_stats_step(row: str, delta: int, dimensions=BOOK_STATS_DIMENSIONS) -> str:
+    return "".join(
+        "INSERT INTO book_stats(dimension, key, count) "
+        f"VALUES ('{name}', {expression.format(row=row)}, {delta}) "
+        f"ON CONFLICT(dimension, key) DO UPDATE SET count = count + ({delta}); "
+        for name, expression in dimensions.items()
+    )
+
+
+BOOK_STATS_DDL = (
+    "CREATE TRIGGER IF NOT EXISTS book_stats_ai AFTER INSERT ON books BEGIN "
+    + _book_stats_step("new", 1, {"total": "''", **BOOK_STATS_DIMENSIONS})
+    + "END",
+    "CREATE TRIGGER IF NOT EXISTS book_stats_ad AFTER DELETE ON books BEGIN "
+    + _book_stats_step("old", -1, {"total": "''", **BOOK_STATS_DIMENSIONS})
+    + "END",
+    "CREATE TRIGGER IF NOT EXISTS book_stats_au AFTER UPDATE OF status, year, isbn, language ON books BEGIN "
+    + _book_stats_step("old", -1)
+    + _book_stats_step("new", 1)
+    + "END",
+)
+
+for _statement in BOOK_STATS_DDL:
+    event.listen(Book.__table__, "after_create", DDL(_statement).execute_if(dialect="sqlite"))
+
+
+# Catalog version behind collection ETags and the facet cache: a single row
+# bumped by triggers in the transaction of every change to `books`, so writes
+# from any process or connection are seen. The epoch is drawn when the row
+# is created, so a recreated database never replays an old version.
+catalog_version = Table(
+    "catalog_version",
+    Base.metadata,
+    Column("id", Integer, primary_key=True),
+    Column("epoch", String(16), nullable=False),
+    Column("version", Integer, nullable=False),
+)
+
+CATALOG_VERSION_SEED = "INSERT INTO catalog_version(id, epoch, version) VALUES (1, lower(hex(randomblob(8))), 0)"
+
+CATALOG_VERSION_DDL = tuple(
+    f"CREATE TRIGGER IF NOT EXISTS catalog_version_{suffix} AFTER {operation} ON books BEGIN "
+    "UPDATE catalog_version SET version = version + 1 WHERE id = 1; "
+    "END"
+    for suffix, operation in (("ai", "INSERT"), ("au", "UPDATE"), ("ad", "DELETE"))
+)
+
+# Created with catalog_version, which sorts after books in create_all
+for _statement in (CATALOG_VERSION_SEED, *CATALOG_VERSION_DDL):
+    event.listen(catalog_version, "after_create", DDL(_statement).execute_if(dialect="sqlite"))
@@ -0,0 +1,25 @@
+from sqlalchemy import Column, Integer, String, DateTime, Float, Text
+from sqlalchemy.sql import func
+from app.core.database import Base
+
+
+class ImportJob(Base):
+    """Progress of a file import; the checkpoint is committed with each chunk."""
+
+    __tablename__ = "import_jobs"
+
+    id = Column(String(64), primary_key=True)
+    source_path = Column(String(500), nullable=False)
+    format = Column(String(10), nullable=False)
+    status = Column(String(20), nullable=False, default="pending")
+    byte_offset = Column(Integer, nullable=False, default=0)
+    line = Column(Integer, nullable=False, default=0)
+    rows_read = Column(Integer, nullable=False, default=0)
+    rows_imported = Column(Integer, nullable=False, default=0)
+    rows_rejected = Column(Integer, nullable=False, default=0)
+    rejects = Column(Text, nullable=True)
+    elapsed_seconds = Column(Float, nullable=False, default=0.0)
+    error = Column(Text, nullable=True)
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
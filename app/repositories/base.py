@@ -1,47 +1,107 @@
-from typing import Generic, Type, TypeVar, Optional, List, Any
+from typing import Generic, Type, TypeVar, Optional, List, Any, Sequence
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, update, delete, func
-from app.core.database import Base
+from sqlalchemy import select, insert, update, delete, func, or_
+from sqlalchemy.orm import load_only
+from app.core.database import Base, write_queue
+from app.core.writer import WriteQueue
 
 ModelType = TypeVar("ModelType", bound=Base)
 
 class BaseRepository(Generic[ModelType]):
-    def __init__(self, model: Type[ModelType], db: AsyncSession):
+    """CRUD over ``db``; create/update/delete run as jobs on the writer queue.
+
+    Each write is a single INSERT/UPDATE/DELETE ... RETURNING statement, so
+    the writer connection spends one round trip per mutation.
+    """
+
+    def __init__(self, model: Type[ModelType], db: AsyncSession, writer: Optional[WriteQueue] = None):
         self.model = model
         self.db = db
+        self.writer = writer or write_queue
 
-    async def get(self, id: Any) -> Optional[ModelType]:
+    async def get(self, id: Any, fields: Optional[Sequence[str]] = None) -> Optional[ModelType]:
+        """Fetch one row; with ``fields`` only those columns (and the key) are loaded."""
         query = select(self.model).where(self.model.id == id)
+        if fields:
+            query = query.options(self._load_only(fields))
         result = await self.db.execute(query)
         return result.scalars().first()
 
+    def _load_only(self, fields: Sequence[str]):
+        return load_only(*(getattr(self.model, name) for name in fields), raiseload=True)
+
     async def get_multi(self, *, skip: int = 0, limit: int = 100) -> List[ModelType]:
         query = select(self.model).offset(skip).limit(limit)
         result = await self.db.execute(query)
         return result.scalars().all()
 
     async def create(self, *, obj_in: dict) -> ModelType:
-        db_obj = self.model(**obj_in)
-        self.db.add(db_obj)
-        await self.db.commit()
-        await self.db.refresh(db_obj)
-        return db_obj
-
-    async def update(self, *, db_obj: ModelType, obj_in: dict) -> ModelType:
-        for field, value in obj_in.items():
-            setattr(db_obj, field, value)
-        self.db.add(db_obj)
-        await self.db.commit()
-        await self.db.refresh(db_obj)
-        return db_obj
+        stmt = insert(self.model).values(**obj_in).returning(self.model)
+
+        async def job(session: AsyncSession) -> ModelType:
+            result = await session.execute(stmt)
+            return result.scalar_one()
+
+        return await self.writer.submit(job)
+
+    async def insert_many(self, *, rows: List[dict]) -> List[int]:
+        """executemany INSERT returning ids in row order; the caller commits."""
+        return await self._insert_rows(self.db, rows)
+
+    async def _insert_rows(self, session: AsyncSession, rows: List[dict]) -> List[int]:
+        if not rows:
+            return []
+        stmt = insert(self.model).returning(self.model.id, sort_by_parameter_order=True)
+        result = await session.execute(stmt, rows)
+        return list(result.scalars().all())
+
+    async def create_many(self, *, rows: List[dict]) -> List[int]:
+        """Insert all rows in one executemany transaction and return their ids in order."""
+        return await self.writer.submit(lambda session: self._insert_rows(session, rows))
+
+    async def update(self, *, db_obj: ModelType, obj_in: dict) -> Optional[ModelType]:
+        """Apply ``obj_in`` to the stored row of ``db_obj``; None if it is gone.
+
+        A payload that changes nothing on ``db_obj`` returns it without
+        queueing a write. Otherwise the whole payload is written, since
+        ``db_obj`` may predate a concurrent update.
+        """
+        if all(getattr(db_obj, field) == value for field, value in obj_in.items()):
+            return db_obj
+        # The IS NOT guard leaves a row that already holds these values (and
+        # its updated_at) untouched.
+        stmt = (
+            update(self.model)
+            .where(self.model.id == db_obj.id)
+            .where(or_(*(getattr(self.model, field).is_distinct_from(value) for field, value in obj_in.items())))
+            .values(**obj_in)
+            .returning(self.model)
+            .execution_options(synchronize_session=False)
+        )
+
+        async def job(session: AsyncSession) -> Optional[ModelType]:
+            result = await session.execute(stmt)
+            stored = result.scalar_one_or_none()
+            if stored is None:
+                # Either deleted or already up to date; only this rare path reads back
+                stored = await session.get(self.model, db_obj.id)
+            return stored
+
+        return await self.writer.submit(job)
 
     async def delete(self, *, id: int) -> bool:
-        db_obj = await self.get(id)
-        if not db_obj:
-            return False
-        await self.db.delete(db_obj)
-        await self.db.commit()
-        return True
+        stmt = (
+            delete(self.model)
+            .where(self.model.id == id)
+            .returning(self.model.id)
+            .execution_options(synchronize_session=False)
+        )
+
+        async def job(session: AsyncSession) -> bool:
+            result = await session.execute(stmt)
+            return result.scalar_one_or_none() is not None
+
+        return await self.writer.submit(job)
 
     async def count(self) -> int:
         query = select(func.count()).select_from(self.model)
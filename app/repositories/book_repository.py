@@ -1,64 +1,395 @@
-from typing import List, Optional, Tuple, Any
-from sqlalchemy import select, or_, func
-from app.models.book import Book
+from typing import AsyncIterator, Dict, Iterable, List, Optional, Sequence, Set, Tuple, Any
+from sqlalchemy import String, case, cast, literal, select, or_, func, tuple_, type_coerce, union_all
+from app.core.etag import CatalogVersion
+from app.models.book import Book, BookStatus, book_stats, books_fts, catalog_version
 from app.repositories.base import BaseRepository
 
+# The FTS5 trigram tokenizer cannot match terms shorter than three characters.
+FTS_MIN_TERM_LENGTH = 3
+
+# Stay well below SQLite's bound-parameter limit in IN (...) lists.
+IN_CLAUSE_CHUNK_SIZE = 500
+
+# Facets the list endpoint can count, as grouping expressions.
+FACET_COLUMNS = {
+    "status": Book.status,
+    "language": Book.language,
+    "decade": (Book.year // 10) * 10,
+}
+
+# Keyset tuple of the last row served: (sort key, id).
+Keyset = Tuple[Any, int]
+
+# Sort keys whose column allows NULL; the others never need a NULL range.
+NULLABLE_SORTS = {"year"}
+
+# created_at is compared as the raw stored text so keyset ties round-trip exactly.
+SORT_KEYS = {
+    "title": Book.title,
+    "author": Book.author,
+    "year": Book.year,
+    "created_at": type_coerce(Book.created_at, String),
+}
+
 class BookRepository(BaseRepository[Book]):
-    def __init__(self, db):
-        super().__init__(Book, db)
+    def __init__(self, db, writer=None):
+        super().__init__(Book, db, writer)
 
     async def get_by_isbn(self, isbn: str) -> Optional[Book]:
         query = select(Book).where(Book.isbn == isbn)
         result = await self.db.execute(query)
         return result.scalars().first()
 
-    async def search_books(
+    async def get_timestamps(self, book_id: int) -> Optional[Tuple[Any, Any]]:
+        """(created_at, updated_at) of a book without loading the row."""
+        result = await self.db.execute(select(Book.created_at, Book.updated_at).where(Book.id == book_id))
+        row = result.first()
+        return tuple(row) if row is not None else None
+
+    async def get_many(self, ids: Iterable[int]) -> List[Book]:
+        """Books with these ids, in no particular order; unknown ids are skipped."""
+        pending = list(ids)
+        books: List[Book] = []
+        for start in range(0, len(pending), IN_CLAUSE_CHUNK_SIZE):
+            chunk = pending[start:start + IN_CLAUSE_CHUNK_SIZE]
+            result = await self.db.execute(select(Book).where(Book.id.in_(chunk)))
+            books.extend(result.scalars().all())
+        return books
+
+    async def get_existing_isbns(self, isbns: Iterable[str]) -> Set[str]:
+        pending = list(isbns)
+        existing: Set[str] = set()
+        for start in range(0, len(pending), IN_CLAUSE_CHUNK_SIZE):
+            chunk = pending[start:start + IN_CLAUSE_CHUNK_SIZE]
+            result = await self.db.execute(select(Book.isbn).where(Book.isbn.in_(chunk)))
+            existing.update(result.scalars().all())
+        return existing
+
+    async def get_catalog_version(self) -> Optional[CatalogVersion]:
+        """(epoch, version) of the catalog, or None where no trigger maintains it (non-SQLite)."""
+        stmt = select(catalog_version.c.epoch, catalog_version.c.version).where(catalog_version.c.id == 1)
+        row = (await self.db.execute(stmt)).first()
+        return tuple(row) if row is not None else None
+
+    async def get_stats(self) -> Dict[str, Dict[str, int]]:
+        """Catalog counters as {dimension: {key: count}}; NULL values are under the key ''.
+
+        On SQLite this reads the trigger-maintained ``book_stats`` table, a
+        few hundred rows at most whatever the catalog size; elsewhere the
+        same figures are aggregated from ``books``.
+        """
+        if self.db.bind.dialect.name == "sqlite":
+            stmt = select(book_stats.c.dimension, book_stats.c.key, book_stats.c.count).where(book_stats.c.count > 0)
+        else:
+            stmt = self._aggregate_stats()
+        stats: Dict[str, Dict[str, int]] = {}
+        for dimension, key, count in (await self.db.execute(stmt)).all():
+            stats.setdefault(dimension, {})[key] = count
+        return stats
+
+    async def facet_counts(
         self,
+        facets: Sequence[str],
         *,
-        skip: int = 0,
-        limit: int = 100,
         q: Optional[str] = None,
         author: Optional[str] = None,
         year: Optional[int] = None,
         year_min: Optional[int] = None,
         year_max: Optional[int] = None,
-        sort: str = "created_at",
-        order: str = "desc",
-    ) -> Tuple[List[Book], int]:
+    ) -> Dict[str, Dict[Any, int]]:
+        """Count the filtered books per value of each facet in FACET_COLUMNS.
+
+        All facets come from one GROUP BY over the filtered rows, split per
+        facet here. Without any filter they are read from the book_stats
+        counters instead of scanning the table.
+        """
+        conditions = self._filter_conditions(
+            q=q, author=author, year=year, year_min=year_min, year_max=year_max
+        )
+        if not conditions and self.db.bind.dialect.name == "sqlite":
+            return self._facets_from_stats(facets, await self.get_stats())
+        return await self._scan_facets(facets, conditions)
+
+    async def _scan_facets(self, facets: Sequence[str], conditions: list) -> Dict[str, Dict[Any, int]]:
+        keys = [FACET_COLUMNS[facet] for facet in facets]
+        stmt = select(*keys, func.count()).where(*conditions).group_by(*keys)
+        counts: Dict[str, Dict[Any, int]] = {facet: {} for facet in facets}
+        for row in (await self.db.execute(stmt)).all():
+            for facet, value in zip(facets, row):
+                counts[facet][value] = counts[facet].get(value, 0) + row[-1]
+        return counts
+
+    @staticmethod
+    def _facets_from_stats(facets: Sequence[str], stats: Dict[str, Dict[str, int]]) -> Dict[str, Dict[Any, int]]:
+        counts: Dict[str, Dict[Any, int]] = {}
+        for facet in facets:
+            values: Dict[Any, int] = {}
+            if facet == "status":
+                values = {BookStatus[name]: count for name, count in stats.get("status", {}).items()}
+            elif facet == "language":
+                values = {language or None: count for language, count in stats.get("language", {}).items()}
+            elif facet == "decade":
+                for year, count in stats.get("year", {}).items():
+                    decade = int(year) // 10 * 10 if year else None
+                    values[decade] = values.get(decade, 0) + count
+            counts[facet] = values
+        return counts
+
+    @staticmethod
+    def _aggregate_stats():
+        keys = {
+            "total": literal(""),
+            "status": cast(Book.status, String),
+            "year": func.coalesce(cast(Book.year, String), ""),
+            "isbn": case((Book.isbn.is_(None), ""), else_="with"),
+            "language": func.coalesce(Book.language, ""),
+        }
+        return union_all(*(
+            select(literal(name).label("dimension"), key.label("key"), func.count().label("count"))
+            .select_from(Book)
+            .group_by(key)
+            for name, key in keys.items()
+        ))
+
+    def _text_condition(self, q: str, column: Optional[str] = None):
+        """Substring match on title/author (or just ``column``), served by FTS when possible."""
+        term = q.strip()
+        if self.db.bind.dialect.name == "sqlite" and len(term) >= FTS_MIN_TERM_LENGTH:
+            phrase = '"' + term.replace('"', '""') + '"'
+            if column is not None:
+                phrase = f"{column} : {phrase}"
+            matches = select(books_fts.c.rowid).where(books_fts.c.books_fts.op("MATCH")(phrase))
+            return Book.id.in_(matches)
+        search = f"%{term}%"
+        if column is not None:
+            return Book.__table__.c[column].ilike(search)
+        return or_(Book.title.ilike(search), Book.author.ilike(search))
+
+    def _filter_conditions(
+        self,
+        *,
+        q: Optional[str] = None,
+        author: Optional[str] = None,
+        year: Optional[int] = None,
+        year_min: Optional[int] = None,
+        year_max: Optional[int] = None,
+    ) -> list:
         conditions = []
-        if q:
-            search = f"%{q.strip()}%"
-            conditions.append(or_(Book.title.ilike(search), Book.author.ilike(search)))
+        if q and q.strip():
+            conditions.append(self._text_condition(q))
         if author:
-            conditions.append(Book.author.ilike(f"%{author.strip()}%"))
+            conditions.append(self._text_condition(author, column="author"))
         if year is not None:
             conditions.append(Book.year == year)
         if year_min is not None:
             conditions.append(Book.year >= year_min)
         if year_max is not None:
             conditions.append(Book.year <= year_max)
+        return conditions
 
-        # Count
-        count_stmt = select(func.count()).select_from(Book)
-        if conditions:
-            count_stmt = count_stmt.where(*conditions)
-        total = await self.db.scalar(count_stmt)
-
-        # Sort
-        sort_map = {
-            "title": Book.title,
-            "author": Book.author,
-            "year": Book.year,
-            "created_at": Book.created_at,
-        }
-        sort_column = sort_map.get(sort, Book.created_at)
-        order_by = sort_column.asc() if order == "asc" else sort_column.desc()
+    @staticmethod
+    def _keyset_ranges(sort: str, order: str, after: Keyset) -> list:
+        """Conditions for the rows after ``after``, in page order.
 
-        # Query
-        stmt = select(Book)
+        Each is a single index range, so a deep page is a seek rather than a
+        walk over the index. SQLite sorts NULLs first: on a nullable key they
+        are a separate range before every key ascending and after it
+        descending. A row value comparison never matches a NULL key.
+        """
+        sort_key = SORT_KEYS.get(sort, SORT_KEYS["created_at"])
+        key, last_id = after
+        if key is None:
+            if order == "asc":
+                return [sort_key.is_(None) & (Book.id > last_id), sort_key.is_not(None)]
+            return [sort_key.is_(None) & (Book.id < last_id)]
+        if order == "asc":
+            return [tuple_(sort_key, Book.id) > tuple_(key, last_id)]
+        ranges = [tuple_(sort_key, Book.id) < tuple_(key, last_id)]
+        if sort in NULLABLE_SORTS:
+            ranges.append(sort_key.is_(None))
+        return ranges
+
+    async def search_books(
+        self,
+        *,
+        skip: int = 0,
+        limit: int = 100,
+        q: Optional[str] = None,
+        author: Optional[str] = None,
+        year: Optional[int] = None,
+        year_min: Optional[int] = None,
+        year_max: Optional[int] = None,
+        sort: str = "created_at",
+        order: str = "desc",
+        after: Optional[Keyset] = None,
+        window_count: bool = False,
+        count: str = "exact",
+        count_cap: int = 10000,
+        fields: Optional[Sequence[str]] = None,
+    ) -> Tuple[List[Book], Optional[int], bool, Optional[Keyset]]:
+        """Return a page of books, the filtered total, whether it was capped and the next keyset.
+
+        When ``after`` is given the page starts right after that keyset and
+        ``skip`` is ignored, so deep pages cost one index seek instead of an
+        OFFSET walk.
+
+        ``count`` picks how the total is computed: ``exact``; ``capped``,
+        which stops counting past ``count_cap``, flagging the total as
+        capped when there are more rows; ``estimate``, which reads the book_stats
+        counter for an unfiltered list and falls back to ``capped`` for a
+        filtered one; ``none``, which returns None. A short offset page
+        already tells the exact total, so no count runs for it.
+
+        With ``window_count`` a filtered offset page carries
+        ``count(*) OVER ()`` so the total arrives with the rows in one
+        statement. The other cases still count with a separate query: an
+        unfiltered count is served from an index while the window would
+        materialize every row, keyset pages only see rows past the keyset,
+        and an empty page has no row to carry the total.
+
+        With ``fields`` the books are loaded with only those columns plus
+        the primary key; touching any other attribute raises instead of
+        lazy loading it row by row.
+        """
+        conditions = self._filter_conditions(
+            q=q, author=author, year=year, year_min=year_min, year_max=year_max
+        )
+        window_count = window_count and count == "exact" and bool(conditions) and after is None
+        statements = self._page_statements(
+            conditions,
+            skip=skip,
+            limit=limit,
+            sort=sort,
+            order=order,
+            after=after,
+            window_count=window_count,
+            fields=fields,
+        )
+
+        # A later keyset range only runs once the earlier ones run out
+        rows = []
+        for stmt in statements:
+            rows.extend((await self.db.execute(stmt)).all())
+            if len(rows) > limit:
+                break
+        total: Optional[int] = None
+        capped = False
+        if window_count and rows:
+            total = rows[0].total
+        elif count != "none" and after is None and 0 < len(rows) <= limit:
+            total = skip + len(rows)
+        elif count == "exact":
+            total = await self._count(conditions)
+        elif count == "estimate" and not conditions:
+            total = await self._estimated_row_count()
+            if total is None:
+                total = await self._count(conditions)
+        elif count in ("capped", "estimate"):
+            total = await self._count(conditions, limit=count_cap + 1)
+            capped = total > count_cap
+
+        next_keyset = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            last_book, last_key = rows[-1][:2]
+            next_keyset = (last_key, last_book.id)
+        return [row[0] for row in rows], total, capped, next_keyset
+
+    def page_statements(self, *, q=None, author=None, year=None, year_min=None, year_max=None, **page):
+        """The SELECTs search_books runs for a page, e.g. to inspect their query plans."""
+        conditions = self._filter_conditions(
+            q=q, author=author, year=year, year_min=year_min, year_max=year_max
+        )
+        return self._page_statements(conditions, **page)
+
+    def _page_statements(
+        self,
+        conditions: list,
+        *,
+        skip: int = 0,
+        limit: int = 100,
+        sort: str = "created_at",
+        order: str = "desc",
+        after: Optional[Keyset] = None,
+        window_count: bool = False,
+        fields: Optional[Sequence[str]] = None,
+    ) -> list:
+        # Sort, with id as tie-breaker so pages are stable
+        sort_key = SORT_KEYS.get(sort, SORT_KEYS["created_at"])
+        if order == "asc":
+            order_by = (sort_key.asc(), Book.id.asc())
+        else:
+            order_by = (sort_key.desc(), Book.id.desc())
+
+        # Query one extra row to learn whether a next page exists
+        columns = [Book, sort_key.label("sort_key")]
+        if window_count:
+            columns.append(func.count().over().label("total"))
+        stmt = select(*columns)
+        if fields:
+            stmt = stmt.options(self._load_only(fields))
         if conditions:
             stmt = stmt.where(*conditions)
-        stmt = stmt.order_by(order_by).offset(skip).limit(limit)
-        
-        result = await self.db.execute(stmt)
-        return result.scalars().all(), int(total or 0)
+        stmt = stmt.order_by(*order_by).limit(limit + 1)
+        if after is None:
+            return [stmt.offset(skip)]
+        return [stmt.where(condition) for condition in self._keyset_ranges(sort, order, after)]
+
+    async def _count(self, conditions: list, limit: Optional[int] = None) -> int:
+        """Count matching rows, stopping after ``limit`` of them when given."""
+        if limit is None:
+            stmt = select(func.count()).select_from(Book)
+            if conditions:
+                stmt = stmt.where(*conditions)
+            return int(await self.db.scalar(stmt) or 0)
+        matches = select(Book.id)
+        if conditions:
+            matches = matches.where(*conditions)
+        stmt = select(func.count()).select_from(matches.limit(limit).subquery())
+        return int(await self.db.scalar(stmt) or 0)
+
+    async def _estimated_row_count(self) -> Optional[int]:
+        """Row count of ``books`` from the trigger-maintained book_stats total (SQLite only)."""
+        if self.db.bind.dialect.name != "sqlite":
+            return None
+        stmt = select(book_stats.c.count).where(book_stats.c.dimension == "total", book_stats.c.key == "")
+        return await self.db.scalar(stmt)
+
+    async def stream_books(
+        self,
+        *,
+        q: Optional[str] = None,
+        author: Optional[str] = None,
+        year: Optional[int] = None,
+        year_min: Optional[int] = None,
+        year_max: Optional[int] = None,
+        chunk_size: int = 1000,
+    ) -> AsyncIterator[Book]:
+        """Yield every matching book in id order without materializing the result.
+
+        Rows come from a server-side cursor in id-keyed windows of
+        ``chunk_size``; each window is its own short read transaction, so a
+        long export never pins a single snapshot.
+        """
+        conditions = self._filter_conditions(
+            q=q, author=author, year=year, year_min=year_min, year_max=year_max
+        )
+        last_id = 0
+        while True:
+            stmt = (
+                select(Book)
+                .where(*conditions, Book.id > last_id)
+                .order_by(Book.id)
+                .limit(chunk_size)
+                .execution_options(yield_per=min(chunk_size, 500))
+            )
+            result = await self.db.stream_scalars(stmt)
+            fetched = 0
+            async for book in result:
+                fetched += 1
+                last_id = book.id
+                yield book
+            self.db.expunge_all()
+            await self.db.commit()
+            if fetched < chunk_size:
+                break
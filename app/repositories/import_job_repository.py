@@ -0,0 +1,6 @@
+from app.models.import_job import ImportJob
+from app.repositories.base import BaseRepository
+
+class ImportJobRepository(BaseRepository[ImportJob]):
+    def __init__(self, db, writer=None):
+        super().__init__(ImportJob, db, writer)
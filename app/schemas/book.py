@@ -1,5 +1,6 @@
-from pydantic import BaseModel, ConfigDict, Field
-from typing import Optional
+from functools import lru_cache
+from pydantic import BaseModel, ConfigDict, Field, TypeAdapter, conint, create_model
+from typing import Dict, List, Optional, Sequence, Tuple, Type
 from datetime import datetime
 from app.models.book import BookStatus
 
@@ -34,3 +35,88 @@ class BookResponse(BookBase):
     updated_at: Optional[datetime] = None
 
     model_config = ConfigDict(from_attributes=True)
+
+# Fields a client may request with ?fields=, in response order.
+BOOK_FIELDS: Tuple[str, ...] = tuple(BookResponse.model_fields)
+
+# Facets a client may request with ?facets= on the list endpoint.
+BOOK_FACETS: Tuple[str, ...] = ("status", "language", "decade")
+
+# Validates ORM rows once and dumps JSON in one pass, for list endpoints
+# that return a raw Response instead of going through response_model.
+BookListAdapter = TypeAdapter(List[BookResponse])
+
+@lru_cache(maxsize=128)
+def book_fields_model(fields: Tuple[str, ...]) -> Type[BaseModel]:
+    """BookResponse restricted to ``fields``, for sparse fieldsets."""
+    return create_model(
+        "BookFieldsResponse",
+        __config__=ConfigDict(from_attributes=True),
+        **{name: (BookResponse.model_fields[name].annotation, BookResponse.model_fields[name]) for name in fields},
+    )
+
+@lru_cache(maxsize=128)
+def _book_list_adapter(fields: Optional[Tuple[str, ...]]) -> TypeAdapter:
+    if fields is None:
+        return BookListAdapter
+    return TypeAdapter(List[book_fields_model(fields)])
+
+def dump_book_list(books, fields: Optional[Sequence[str]] = None) -> bytes:
+    """JSON for a list of Book rows, byte-identical to response_model=List[BookResponse].
+
+    With ``fields`` only those keys are validated and written, so rows
+    loaded with just those columns serialize without touching the rest.
+    """
+    adapter = _book_list_adapter(tuple(fields) if fields is not None else None)
+    return adapter.dump_json(adapter.validate_python(books, from_attributes=True))
+
+def dump_book(book, fields: Sequence[str]) -> bytes:
+    model = book_fields_model(tuple(fields))
+    return model.model_validate(book).model_dump_json()
+
+class BookBatchGetRequest(BaseModel):
+    # Bounded to SQLite's INTEGER range; larger ids overflow the driver
+    ids: List[conint(ge=1, le=2**63 - 1)] = Field(..., min_length=1)
+
+class BookBatchGetResponse(BaseModel):
+    books: List[BookResponse]
+    missing: List[int]
+
+class BookLanguageCount(BaseModel):
+    language: Optional[str]
+    count: int
+
+class BookStatsResponse(BaseModel):
+    total: int
+    by_status: Dict[BookStatus, int]
+    year_min: Optional[int] = None
+    year_max: Optional[int] = None
+    with_isbn: int
+    isbn_coverage: float = Field(..., description="Share of books with an ISBN, 0 to 1")
+    by_language: List[BookLanguageCount] = Field(..., description="Most common first; null for books without a language")
+
+class BookBulkItemResult(BaseModel):
+    index: int
+    id: Optional[int] = None
+    error: Optional[str] = None
+
+class BookBulkResponse(BaseModel):
+    created: int
+    failed: int
+    results: List[BookBulkItemResult]
+
+class BookImportReject(BaseModel):
+    line: int
+    error: str
+
+class BookImportReport(BaseModel):
+    job_id: str
+    status: str
+    rows_read: int
+    rows_imported: int
+    rows_rejected: int
+    rows_per_second: float
+    elapsed_seconds: float
+    byte_offset: int
+    rejects: List[BookImportReject] = []
+    error: Optional[str] = None
@@ -1,17 +1,70 @@
+import csv
+import io
+import json
 import re
+import time
 import httpx
-from typing import List, Optional, Tuple
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence, Tuple
 
 from fastapi import HTTPException, status
+from pydantic import ValidationError
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.models.book import Book
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.etag import CatalogVersion, book_etag
+from app.core.http import get_http_client
+from app.core.metrics import openlibrary_errors, openlibrary_request_duration, register_cache
+from app.core.pagination import Cursor, decode_cursor, encode_cursor
+from app.core.singleflight import SingleFlight
+from app.models.book import Book, BookStatus
 from app.repositories.book_repository import BookRepository
-from app.schemas.book import BookCreate, BookUpdate
+from app.schemas.book import (
+    BookBulkItemResult,
+    BookBulkResponse,
+    BookCreate,
+    BookLanguageCount,
+    BookResponse,
+    BookStatsResponse,
+    BookUpdate,
+)
+
+# Normalized ISBN -> OpenLibrary metadata ({} for ISBNs the registry does not know).
+isbn_cache = TTLCache(maxsize=settings.ISBN_CACHE_MAXSIZE, ttl=settings.ISBN_CACHE_TTL)
+register_cache("isbn_lookup", isbn_cache)
+# Concurrent lookups of the same ISBN share a single outbound request.
+isbn_lookups = SingleFlight()
+# (catalog version, facets, normalized filters) -> X-Facets JSON. The version
+# in the key retires every entry at the next committed write to books.
+facet_cache = TTLCache(maxsize=settings.FACET_CACHE_MAXSIZE, ttl=settings.FACET_CACHE_TTL)
+
+# Column order for exports; flush streamed output in blocks of this many bytes.
+EXPORT_FIELDS = ["id", *(name for name in BookResponse.model_fields if name != "id")]
+EXPORT_FLUSH_BYTES = 64 * 1024
+
+ISBN_CONFLICT = "ISBN already exists"
+INTEGRITY_ERROR = "Integrity constraint violated"
+
+def describe_validation_error(exc: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}" for error in exc.errors()
+    )
+
+def _is_isbn_conflict(exc: IntegrityError) -> bool:
+    """Whether the unique ISBN index rejected the write (SQLite: "UNIQUE constraint failed: books.isbn")."""
+    return "isbn" in str(exc.orig).lower()
+
+def _top_values(items: List[dict], limit: int) -> List[dict]:
+    """The first ``limit`` facet entries, the rest summed into one ``{"other": true}`` entry."""
+    if len(items) <= limit:
+        return items
+    return [*items[:limit], {"other": True, "count": sum(item["count"] for item in items[limit:])}]
 
 class BookService:
-    def __init__(self, db: AsyncSession):
+    def __init__(self, db: AsyncSession, http_client: Optional[httpx.AsyncClient] = None):
         self.repo = BookRepository(db)
+        self._http_client = http_client
         self._isbn_pattern = re.compile(r"[\s-]")
 
     def _normalize_isbn(self, isbn: Optional[str]) -> Optional[str]:
@@ -21,43 +74,60 @@ class BookService:
         return cleaned or None
 
     async def fetch_book_by_isbn(self, isbn: str) -> dict:
-        """Fetch book metadata from OpenLibrary API."""
+        """Fetch book metadata from OpenLibrary API, served from cache when possible."""
         normalized_isbn = self._normalize_isbn(isbn)
         if not normalized_isbn:
             return {}
-        
-        async with httpx.AsyncClient() as client:
-            try:
-                response = await client.get(
-                    f"https://openlibrary.org/api/books?bibkeys=ISBN:{normalized_isbn}&format=json&jscmd=data",
-                    timeout=5.0
-                )
-                if response.status_code == 200:
-                    data = response.json()
-                    key = f"ISBN:{normalized_isbn}"
-                    if key in data:
-                        book_data = data[key]
-                        return {
-                            "title": book_data.get("title"),
-                            "author": book_data.get("authors", [{}])[0].get("name") if book_data.get("authors") else None,
-                            "year": int(book_data.get("publish_date", "").split()[-1]) if book_data.get("publish_date") and book_data.get("publish_date").split()[-1].isdigit() else None,
-                            "description": book_data.get("notes") or book_data.get("subtitle"),
-                            "cover_url": book_data.get("cover", {}).get("large"),
-                            "page_count": book_data.get("number_of_pages"),
-                        }
-            except Exception:
-                pass
-        return {}
+
+        cached = isbn_cache.get(normalized_isbn)
+        if cached is not None:
+            return dict(cached)
+
+        metadata = await isbn_lookups.do(normalized_isbn, lambda: self._lookup_and_cache(normalized_isbn))
+        return dict(metadata)
+
+    async def _lookup_and_cache(self, normalized_isbn: str) -> dict:
+        try:
+            metadata = await self._request_metadata(normalized_isbn)
+        except Exception:
+            # Transient failures are not cached so the next lookup retries.
+            return {}
+        ttl = settings.ISBN_CACHE_TTL if metadata else settings.ISBN_CACHE_NEGATIVE_TTL
+        isbn_cache.set(normalized_isbn, metadata, ttl=ttl)
+        return metadata
+
+    async def _request_metadata(self, normalized_isbn: str) -> dict:
+        client = self._http_client or get_http_client()
+        started = time.perf_counter()
+        try:
+            response = await client.get(
+                f"{settings.OPENLIBRARY_URL}/api/books",
+                params={"bibkeys": f"ISBN:{normalized_isbn}", "format": "json", "jscmd": "data"},
+            )
+            response.raise_for_status()
+            data = response.json()
+        except Exception as exc:
+            openlibrary_request_duration.observe(time.perf_counter() - started, "error")
+            openlibrary_errors.inc(type(exc).__name__)
+            raise
+        openlibrary_request_duration.observe(time.perf_counter() - started, "ok")
+        key = f"ISBN:{normalized_isbn}"
+        if key not in data:
+            return {}
+        book_data = data[key]
+        return {
+            "title": book_data.get("title"),
+            "author": book_data.get("authors", [{}])[0].get("name") if book_data.get("authors") else None,
+            "year": int(book_data.get("publish_date", "").split()[-1]) if book_data.get("publish_date") and book_data.get("publish_date").split()[-1].isdigit() else None,
+            "description": book_data.get("notes") or book_data.get("subtitle"),
+            "cover_url": book_data.get("cover", {}).get("large"),
+            "page_count": book_data.get("number_of_pages"),
+        }
 
     async def create_book(self, book_in: BookCreate) -> Book:
         payload = book_in.model_dump()
         payload["isbn"] = self._normalize_isbn(payload.get("isbn"))
-        
-        if payload["isbn"]:
-            existing = await self.repo.get_by_isbn(payload["isbn"])
-            if existing:
-                raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="ISBN already exists")
-        
+
         # If some fields are missing and ISBN is present, try to auto-fill
         if payload["isbn"] and (not payload.get("description") or not payload.get("cover_url")):
             metadata = await self.fetch_book_by_isbn(payload["isbn"])
@@ -65,10 +135,130 @@ class BookService:
                 if not payload.get(key) and value:
                     payload[key] = value
 
-        return await self.repo.create(obj_in=payload)
+        try:
+            return await self.repo.create(obj_in=payload)
+        except IntegrityError as exc:
+            # Uniqueness is left to the index: a pre-read would race with concurrent writers
+            if _is_isbn_conflict(exc):
+                raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=ISBN_CONFLICT) from exc
+            raise
 
-    async def get_book(self, book_id: int) -> Optional[Book]:
-        return await self.repo.get(book_id)
+    def prepare_payload(self, book_in: BookCreate) -> dict:
+        payload = book_in.model_dump()
+        payload["isbn"] = self._normalize_isbn(payload.get("isbn"))
+        return payload
+
+    async def partition_new_books(
+        self, payloads: List[dict], indexes: Optional[Sequence[int]] = None
+    ) -> Tuple[List[Tuple[int, dict]], Dict[int, str]]:
+        """Split prepared payloads into insertable rows and per-index ISBN conflicts.
+
+        Stored ISBNs are checked with one chunked IN query; repeats within
+        the batch keep only their first occurrence. ``indexes`` numbers the
+        payloads (default: their positions) in the result and messages.
+        """
+        existing = await self.repo.get_existing_isbns({p["isbn"] for p in payloads if p["isbn"]})
+        first_seen: Dict[str, int] = {}
+        pending: List[Tuple[int, dict]] = []
+        errors: Dict[int, str] = {}
+        for index, payload in zip(indexes if indexes is not None else range(len(payloads)), payloads):
+            isbn = payload["isbn"]
+            if isbn in existing:
+                errors[index] = ISBN_CONFLICT
+                continue
+            if isbn and isbn in first_seen:
+                errors[index] = f"Duplicate ISBN in batch (item {first_seen[isbn]})"
+                continue
+            if isbn:
+                first_seen[isbn] = index
+            pending.append((index, payload))
+        return pending, errors
+
+    async def bulk_create_books(self, books_in: List[Dict[str, Any]]) -> BookBulkResponse:
+        """Insert many books in chunked transactions, reporting a result per item.
+
+        Items are validated one by one, so invalid items and duplicate ISBNs
+        (within the batch or already stored) are rejected individually
+        instead of failing the batch. Metadata auto-fill is skipped: it
+        would mean one outbound lookup per row.
+        """
+        results: List[Optional[BookBulkItemResult]] = [None] * len(books_in)
+        indexes: List[int] = []
+        payloads: List[dict] = []
+        for index, item in enumerate(books_in):
+            try:
+                payloads.append(self.prepare_payload(BookCreate.model_validate(item)))
+                indexes.append(index)
+            except ValidationError as exc:
+                results[index] = BookBulkItemResult(index=index, error=describe_validation_error(exc))
+
+        pending, errors = await self.partition_new_books(payloads, indexes)
+        for index, error in errors.items():
+            results[index] = BookBulkItemResult(index=index, error=error)
+
+        chunk_size = max(1, settings.BULK_CHUNK_SIZE)
+        for start in range(0, len(pending), chunk_size):
+            chunk = pending[start:start + chunk_size]
+            try:
+                ids = await self.repo.create_many(rows=[payload for _, payload in chunk])
+            except IntegrityError:
+                # E.g. a concurrent writer took one of the ISBNs: retry row by row to isolate the failure.
+                ids = []
+                for index, payload in chunk:
+                    try:
+                        ids.extend(await self.repo.create_many(rows=[payload]))
+                    except IntegrityError as exc:
+                        ids.append(None)
+                        error = ISBN_CONFLICT if _is_isbn_conflict(exc) else INTEGRITY_ERROR
+                        results[index] = BookBulkItemResult(index=index, error=error)
+            for (index, _), book_id in zip(chunk, ids):
+                if book_id is not None:
+                    results[index] = BookBulkItemResult(index=index, id=book_id)
+
+        created = sum(1 for result in results if result.id is not None)
+        return BookBulkResponse(created=created, failed=len(results) - created, results=results)
+
+    async def get_book(self, book_id: int, fields: Optional[Sequence[str]] = None) -> Optional[Book]:
+        if fields:
+            # The timestamps are needed for the ETag whatever the client asked for
+            fields = {*fields, "created_at", "updated_at"}
+        return await self.repo.get(book_id, fields=fields)
+
+    async def get_books_by_ids(self, ids: List[int]) -> Tuple[List[Book], List[int]]:
+        """Books in request order (repeats collapsed), plus the ids that do not exist."""
+        requested = list(dict.fromkeys(ids))
+        found = {book.id: book for book in await self.repo.get_many(requested)}
+        books = [found[book_id] for book_id in requested if book_id in found]
+        missing = [book_id for book_id in requested if book_id not in found]
+        return books, missing
+
+    async def get_stats(self) -> BookStatsResponse:
+        stats = await self.repo.get_stats()
+        total = stats.get("total", {}).get("", 0)
+        by_status = {status_: stats.get("status", {}).get(status_.name, 0) for status_ in BookStatus}
+        years = [int(year) for year in stats.get("year", {}) if year]
+        with_isbn = stats.get("isbn", {}).get("with", 0)
+        languages = sorted(stats.get("language", {}).items(), key=lambda item: (-item[1], item[0]))
+        return BookStatsResponse(
+            total=total,
+            by_status=by_status,
+            year_min=min(years, default=None),
+            year_max=max(years, default=None),
+            with_isbn=with_isbn,
+            isbn_coverage=round(with_isbn / total, 4) if total else 0.0,
+            by_language=[
+                BookLanguageCount(language=language or None, count=count) for language, count in languages
+            ],
+        )
+
+    async def get_catalog_version(self) -> Optional[CatalogVersion]:
+        return await self.repo.get_catalog_version()
+
+    async def get_book_etag(self, book_id: int, fields: Optional[Sequence[str]] = None) -> Optional[str]:
+        timestamps = await self.repo.get_timestamps(book_id)
+        if timestamps is None:
+            return None
+        return book_etag(book_id, *timestamps, fields=fields)
 
     async def get_books(
         self,
@@ -82,8 +272,29 @@ class BookService:
         year_max: Optional[int] = None,
         sort: str = "created_at",
         order: str = "desc",
-    ) -> Tuple[List[Book], int]:
-        return await self.repo.search_books(
+        cursor: Optional[str] = None,
+        count: str = "exact",
+        fields: Optional[Sequence[str]] = None,
+    ) -> Tuple[List[Book], Optional[str], Optional[str]]:
+        """Return a page, its X-Total-Count value and the next cursor.
+
+        The total is None for ``count="none"`` and ``"<cap>+"`` when a capped
+        count ran past LIST_COUNT_CAP.
+        """
+        after = None
+        if cursor:
+            try:
+                position = decode_cursor(cursor)
+            except ValueError:
+                raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+            if position.sort != sort or position.order != order:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="Cursor does not match the requested sort/order",
+                )
+            after = (position.key, position.id)
+
+        books, total, capped, next_keyset = await self.repo.search_books(
             skip=skip,
             limit=limit,
             q=q,
@@ -93,7 +304,112 @@ class BookService:
             year_max=year_max,
             sort=sort,
             order=order,
+            after=after,
+            window_count=settings.LIST_WINDOW_COUNT,
+            count=count,
+            count_cap=settings.LIST_COUNT_CAP,
+            fields=fields,
+        )
+        total_header = None
+        if total is not None:
+            total_header = f"{settings.LIST_COUNT_CAP}+" if capped else str(total)
+        next_cursor = None
+        if next_keyset is not None:
+            key, last_id = next_keyset
+            next_cursor = encode_cursor(Cursor(sort=sort, order=order, key=key, id=last_id))
+        return books, total_header, next_cursor
+
+    async def get_facets(
+        self,
+        facets: Sequence[str],
+        *,
+        q: Optional[str] = None,
+        author: Optional[str] = None,
+        year: Optional[int] = None,
+        year_min: Optional[int] = None,
+        year_max: Optional[int] = None,
+    ) -> str:
+        """JSON for the X-Facets header: per facet, its values and counts, most common first.
+
+        Each facet lists at most FACET_MAX_VALUES values, fewer if the header
+        would exceed FACET_HEADER_MAX_BYTES; the rest are summed in an
+        ``{"other": true, "count": n}`` entry.
+        """
+        # Text filters match case-insensitively, so they share cache entries across case
+        filters = (
+            q.strip().lower() if q else None,
+            author.strip().lower() if author else None,
+            year,
+            year_min,
+            year_max,
+        )
+        version = await self.repo.get_catalog_version()
+        # Without a version there is no telling when an entry goes stale
+        key = (version, tuple(facets), filters) if version is not None else None
+        cached = facet_cache.get(key) if key is not None else None
+        if cached is not None:
+            return cached
+
+        counts = await self.repo.facet_counts(
+            facets, q=q, author=author, year=year, year_min=year_min, year_max=year_max
         )
+        ranked = {
+            facet: [
+                {"value": value.value if isinstance(value, BookStatus) else value, "count": count}
+                for value, count in sorted(values.items(), key=lambda item: (-item[1], item[0] is None, str(item[0])))
+                if count > 0
+            ]
+            for facet, values in counts.items()
+        }
+        # ASCII-escaped: header values must be latin-1
+        for limit in range(settings.FACET_MAX_VALUES, -1, -1):
+            result = {facet: _top_values(items, limit) for facet, items in ranked.items()}
+            payload = json.dumps(result, separators=(",", ":"))
+            if len(payload) <= settings.FACET_HEADER_MAX_BYTES:
+                break
+        if key is not None:
+            facet_cache.set(key, payload)
+        return payload
+
+    async def export_books(
+        self,
+        *,
+        format: str = "ndjson",
+        q: Optional[str] = None,
+        author: Optional[str] = None,
+        year: Optional[int] = None,
+        year_min: Optional[int] = None,
+        year_max: Optional[int] = None,
+    ) -> AsyncIterator[bytes]:
+        """Stream the filtered catalogue as NDJSON or CSV in constant memory."""
+        buffer = io.StringIO()
+        writer = None
+        if format == "csv":
+            writer = csv.writer(buffer)
+            writer.writerow(EXPORT_FIELDS)
+
+        books = self.repo.stream_books(
+            q=q,
+            author=author,
+            year=year,
+            year_min=year_min,
+            year_max=year_max,
+            chunk_size=settings.EXPORT_CHUNK_SIZE,
+        )
+        async for book in books:
+            record = BookResponse.model_validate(book)
+            if writer is not None:
+                row = record.model_dump(mode="json")
+                writer.writerow(["" if row[name] is None else row[name] for name in EXPORT_FIELDS])
+            else:
+                buffer.write(record.model_dump_json())
+                buffer.write("\n")
+            if buffer.tell() >= EXPORT_FLUSH_BYTES:
+                yield buffer.getvalue().encode()
+                buffer.seek(0)
+                buffer.truncate()
+        if buffer.tell():
+            yield buffer.getvalue().encode()
 
     async def update_book(self, book_id: int, book_in: BookUpdate) -> Optional[Book]:
         book = await self.repo.get(book_id)
@@ -103,12 +419,14 @@ class BookService:
         update_data = book_in.model_dump(exclude_unset=True)
         if "isbn" in update_data:
             update_data["isbn"] = self._normalize_isbn(update_data.get("isbn"))
-            if update_data["isbn"]:
-                existing = await self.repo.get_by_isbn(update_data["isbn"])
-                if existing and existing.id != book_id:
-                    raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="ISBN already exists")
-        
-        return await self.repo.update(db_obj=book, obj_in=update_data)
+
+        try:
+            return await self.repo.update(db_obj=book, obj_in=update_data)
+        except IntegrityError as exc:
+            # Uniqueness is left to the index: a pre-read would race with concurrent writers
+            if _is_isbn_conflict(exc):
+                raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=ISBN_CONFLICT) from exc
+            raise
 
     async def delete_book(self, book_id: int) -> bool:
         return await self.repo.delete(id=book_id)
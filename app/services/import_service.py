@@ -0,0 +1,283 @@
+import asyncio
+import csv
+import io
+import json
+import os
+import time
+from typing import AsyncIterator, Callable, List, NamedTuple, Optional, Set, Tuple
+
+import aiofiles
+from pydantic import ValidationError
+from sqlalchemy.exc import IntegrityError
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.models.import_job import ImportJob
+from app.repositories.import_job_repository import ImportJobRepository
+from app.schemas.book import BookCreate, BookImportReport
+from app.services.book_service import BookService, describe_validation_error
+
+READ_BLOCK_SIZE = 1024 * 1024
+# Retries of a chunk whose ISBNs were taken by a concurrent writer mid-flight.
+INSERT_ATTEMPTS = 3
+
+
+class Record(NamedTuple):
+    line: int  # first line of the record, for reporting
+    end_line: int  # last line consumed, for the checkpoint
+    end_offset: int  # byte offset just past the record
+    data: Optional[dict]
+    error: Optional[str]
+
+
+# Job ids being imported by this process, so a job never runs twice at once.
+_running_jobs: Set[str] = set()
+
+
+async def _iter_lines(f, block_size: int = READ_BLOCK_SIZE) -> AsyncIterator[bytes]:
+    """Yield raw lines (newline included) while reading the file in large blocks."""
+    remainder = b""
+    while True:
+        block = await f.read(block_size)
+        if not block:
+            if remainder:
+                yield remainder
+            return
+        lines = (remainder + block).split(b"\n")
+        remainder = lines.pop()
+        for line in lines:
+            yield line + b"\n"
+
+
+class BookImportService:
+    """Resumable, streaming import of CSV/NDJSON catalogue files.
+
+    A reader task parses the file incrementally into chunks and hands them
+    to the writer through a bounded queue, so a slow database stalls the
+    reader instead of growing memory. Each chunk's rows and the job
+    checkpoint commit in one transaction: running the same job again
+    resumes right after the last committed chunk.
+    """
+
+    def __init__(
+        self,
+        session_factory=AsyncSessionLocal,
+        *,
+        chunk_size: Optional[int] = None,
+        on_progress: Optional[Callable[[BookImportReport], None]] = None,
+    ):
+        self.session_factory = session_factory
+        self.chunk_size = max(1, chunk_size or settings.IMPORT_CHUNK_SIZE)
+        self.on_progress = on_progress
+
+    @staticmethod
+    def is_running(job_id: str) -> bool:
+        return job_id in _running_jobs
+
+    @staticmethod
+    def build_report(job: ImportJob) -> BookImportReport:
+        elapsed = job.elapsed_seconds or 0.0
+        return BookImportReport(
+            job_id=job.id,
+            status=job.status,
+            rows_read=job.rows_read,
+            rows_imported=job.rows_imported,
+            rows_rejected=job.rows_rejected,
+            rows_per_second=round(job.rows_read / elapsed, 1) if elapsed else 0.0,
+            elapsed_seconds=round(elapsed, 3),
+            byte_offset=job.byte_offset,
+            rejects=json.loads(job.rejects or "[]"),
+            error=job.error,
+        )
+
+    async def get_report(self, job_id: str) -> Optional[BookImportReport]:
+        async with self.session_factory() as session:
+            job = await ImportJobRepository(session).get(job_id)
+            return self.build_report(job) if job else None
+
+    async def spool_upload(self, job_id: str, format: str, chunks: AsyncIterator[bytes]) -> str:
+        """Persist an upload to IMPORT_DIR so the job can be resumed from disk."""
+        os.makedirs(settings.IMPORT_DIR, exist_ok=True)
+        path = os.path.join(settings.IMPORT_DIR, f"{job_id}.{format}")
+        async with aiofiles.open(path, "wb") as f:
+            async for chunk in chunks:
+                await f.write(chunk)
+        return path
+
+    async def create_job(self, job_id: str, source_path: str, format: str) -> BookImportReport:
+        async with self.session_factory() as session:
+            job = await ImportJobRepository(session).create(
+                obj_in={
+                    "id": job_id,
+                    "source_path": source_path,
+                    "format": format,
+                    "status": "pending",
+                    "byte_offset": 0,
+                    "line": 0,
+                    "rows_read": 0,
+                    "rows_imported": 0,
+                    "rows_rejected": 0,
+                    "elapsed_seconds": 0.0,
+                }
+            )
+            return self.build_report(job)
+
+    async def run(self, job_id: str) -> BookImportReport:
+        if job_id in _running_jobs:
+            raise RuntimeError(f"Import {job_id} is already running")
+        _running_jobs.add(job_id)
+        try:
+            async with self.session_factory() as session:
+                job = await ImportJobRepository(session).get(job_id)
+                if job is None:
+                    raise LookupError(f"Import {job_id} does not exist")
+                if job.status != "completed":
+                    await self._run(session, job)
+                return self.build_report(job)
+        finally:
+            _running_jobs.discard(job_id)
+
+    async def _run(self, session, job: ImportJob) -> None:
+        job.status = "running"
+        job.error = None
+        await session.commit()
+
+        books = BookService(session)
+        queue: asyncio.Queue = asyncio.Queue(maxsize=max(1, settings.IMPORT_QUEUE_DEPTH))
+        reader = asyncio.create_task(
+            self._produce(job.source_path, job.format, job.byte_offset, job.line, queue)
+        )
+        started = time.perf_counter()
+        try:
+            while True:
+                chunk = await queue.get()
+                if chunk is None:
+                    break
+                await self._write_chunk(session, books, job, chunk, started)
+            await reader
+            job.status = "completed"
+        except Exception as exc:
+            reader.cancel()
+            await session.rollback()
+            await session.refresh(job)
+            job.status = "failed"
+            job.error = str(exc) or exc.__class__.__name__
+        finally:
+            if job.status == "running":
+                # Cancelled mid-chunk: leave the last checkpoint in place for a resume.
+                reader.cancel()
+        job.elapsed_seconds += time.perf_counter() - started
+        await session.commit()
+
+    async def _produce(self, path: str, format: str, offset: int, line: int, queue: asyncio.Queue) -> None:
+        try:
+            chunk: List[Record] = []
+            async for record in self._read_records(path, format, offset, line):
+                chunk.append(record)
+                if len(chunk) >= self.chunk_size:
+                    await queue.put(chunk)
+                    chunk = []
+            if chunk:
+                await queue.put(chunk)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            await queue.put(None)
+            raise
+        await queue.put(None)
+
+    async def _read_records(self, path: str, format: str, offset: int, line: int) -> AsyncIterator[Record]:
+        async with aiofiles.open(path, "rb") as f:
+            header: List[str] = []
+            if format == "csv":
+                header_line = await f.readline()
+                header = [name.strip() for name in next(csv.reader([header_line.decode("utf-8-sig")]), [])]
+                if offset == 0:
+                    offset, line = len(header_line), 1
+            await f.seek(offset)
+
+            pending, pending_line = b"", 0
+            async for raw in _iter_lines(f):
+                offset += len(raw)
+                line += 1
+                if format == "ndjson":
+                    if raw.strip():
+                        yield self._parse_ndjson(raw, line, offset)
+                    continue
+                if not pending:
+                    pending_line = line
+                pending += raw
+                if pending.count(b'"') % 2:
+                    continue  # a quoted field spans lines
+                if pending.strip():
+                    yield self._parse_csv(pending, header, pending_line, line, offset)
+                pending = b""
+            if pending.strip():
+                yield Record(pending_line, line, offset, None, "Unterminated quoted field")
+
+    @staticmethod
+    def _parse_ndjson(raw: bytes, line: int, offset: int) -> Record:
+        try:
+            data = json.loads(raw)
+        except ValueError as exc:
+            return Record(line, line, offset, None, f"Invalid JSON: {exc}")
+        if not isinstance(data, dict):
+            return Record(line, line, offset, None, "Expected a JSON object")
+        return Record(line, line, offset, data, None)
+
+    @staticmethod
+    def _parse_csv(raw: bytes, header: List[str], line: int, end_line: int, offset: int) -> Record:
+        try:
+            values = next(csv.reader(io.StringIO(raw.decode("utf-8"))))
+        except (UnicodeDecodeError, csv.Error) as exc:
+            return Record(line, end_line, offset, None, f"Unreadable row: {exc}")
+        if len(values) != len(header):
+            return Record(line, end_line, offset, None, f"Expected {len(header)} columns, got {len(values)}")
+        # Empty cells fall back to the schema defaults
+        data = {name: value for name, value in zip(header, values) if value != ""}
+        return Record(line, end_line, offset, data, None)
+
+    async def _write_chunk(self, session, books: BookService, job: ImportJob, chunk: List[Record], started: float) -> None:
+        rejects: List[Tuple[int, str]] = []
+        payloads: List[dict] = []
+        lines: List[int] = []
+        for record in chunk:
+            error = record.error
+            if error is None:
+                try:
+                    payloads.append(books.prepare_payload(BookCreate.model_validate(record.data)))
+                    lines.append(record.line)
+                    continue
+                except ValidationError as exc:
+                    error = describe_validation_error(exc)
+            rejects.append((record.line, error))
+
+        for attempt in range(INSERT_ATTEMPTS):
+            pending, conflicts = await books.partition_new_books(payloads)
+            try:
+                await books.repo.insert_many(rows=[payload for _, payload in pending])
+                break
+            except IntegrityError:
+                await session.rollback()
+                await session.refresh(job)
+                if attempt == INSERT_ATTEMPTS - 1:
+                    raise
+        rejects.extend((lines[index], error) for index, error in conflicts.items())
+
+        stored = json.loads(job.rejects or "[]")
+        room = settings.IMPORT_MAX_REPORTED_REJECTS - len(stored)
+        if room > 0 and rejects:
+            stored.extend({"line": line, "error": error} for line, error in sorted(rejects)[:room])
+            job.rejects = json.dumps(stored)
+        job.line, job.byte_offset = chunk[-1].end_line, chunk[-1].end_offset
+        job.rows_read += len(chunk)
+        job.rows_imported += len(pending)
+        job.rows_rejected += len(rejects)
+        await session.commit()
+
+        if self.on_progress is not None:
+            progress = self.build_report(job)
+            elapsed = job.elapsed_seconds + time.perf_counter() - started
+            progress.elapsed_seconds = round(elapsed, 3)
+            progress.rows_per_second = round(job.rows_read / elapsed, 1) if elapsed else 0.0
+            self.on_progress(progress)
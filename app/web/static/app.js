@@ -5,6 +5,9 @@
 
 const apiBase = window.APP_CONFIG?.apiBase || "/api/v1";
 const bookEndpoint = `${apiBase}/books/`;
+const LIST_CACHE_SIZE = 50;
+// Columns the list and the inspector's first paint use; the full record is fetched on select
+const LIST_FIELDS = "id,title,author,year,isbn,status";
 
 // Visual Config & Status Labels
 const STATUS_META = {
@@ -17,8 +20,12 @@ const STATUS_META = {
 const state = {
     books: [],
     selectedId: null,
+    // Full record of the selected book (list rows only carry LIST_FIELDS)
+    selectedBook: null,
     total: 0,
     isEditing: false,
+    // Last response per list URL, replayed when the server answers 304
+    listCache: new Map(),
     filters: {
         q: "",
         author: "",
@@ -136,17 +143,35 @@ const fetchBooks = async () => {
     params.set("limit", state.filters.limit);
     params.set("sort", state.filters.sort);
     params.set("order", state.filters.order);
+    params.set("count", "capped");
+    params.set("fields", LIST_FIELDS);
 
     try {
-        const response = await fetch(`${bookEndpoint}?${params}`);
-        if (!response.ok) throw new Error("Erro ao carregar acervo.");
-        
-        const data = await response.json();
-        state.books = data;
-        state.total = parseInt(response.headers.get("X-Total-Count") || data.length);
+        const url = `${bookEndpoint}?${params}`;
+        const cached = state.listCache.get(url);
+        const headers = cached ? { "If-None-Match": cached.etag } : {};
+        // no-store: handle the 304 here instead of the HTTP cache hiding it
+        const response = await fetch(url, { headers, cache: "no-store" });
+
+        if (response.status === 304 && cached) {
+            state.books = cached.books;
+            state.total = cached.total;
+        } else {
+            if (!response.ok) throw new Error("Erro ao carregar acervo.");
+            const data = await response.json();
+            state.books = data;
+            // Capped counts arrive as e.g. "10000+", so keep the header text as is.
+            state.total = response.headers.get("X-Total-Count") || String(data.length);
+            const etag = response.headers.get("ETag");
+            if (etag) {
+                state.listCache.delete(url);
+                state.listCache.set(url, { etag, books: data, total: state.total });
+                if (state.listCache.size > LIST_CACHE_SIZE) state.listCache.delete(state.listCache.keys().next().value);
+            }
+        }
         
         renderBooks();
-        renderStats();
+        fetchStats();
     } catch (err) {
         showToast(err.message, "error");
     } finally {
@@ -172,6 +197,23 @@ const createOrUpdateBook = async (payload) => {
     return response.json();
 };
 
+// Catalog-wide figures, independent of the current filters and page
+const fetchStats = async () => {
+    try {
+        const response = await fetch(`${bookEndpoint}stats`);
+        if (!response.ok) throw new Error("Erro ao carregar estatísticas.");
+        renderStats(await response.json());
+    } catch (err) {
+        showToast(err.message, "error");
+    }
+};
+
+const fetchBook = async (id) => {
+    const response = await fetch(`${bookEndpoint}${id}`);
+    if (!response.ok) throw new Error("Erro ao carregar livro.");
+    return response.json();
+};
+
 const deleteBook = async (id) => {
     const response = await fetch(`${bookEndpoint}${id}`, { method: "DELETE" });
     if (!response.ok) throw new Error("Erro ao excluir livro.");
@@ -213,16 +255,34 @@ const renderBooks = () => {
     });
 };
 
-const renderStats = () => {
-    els.statTotal.textContent = state.total;
-    const years = state.books.map(b => b.year).filter(y => y > 0);
-    els.statLatest.textContent = years.length ? Math.max(...years) : "-";
-    els.statIsbn.textContent = state.books.filter(b => b.isbn).length;
+const renderStats = (stats) => {
+    els.statTotal.textContent = stats.total;
+    els.statLatest.textContent = stats.year_max || "-";
+    els.statIsbn.textContent = stats.with_isbn;
 };
 
-const selectBook = (book) => {
+const selectBook = async (book) => {
     state.selectedId = book.id;
-    
+    state.selectedBook = "description" in book ? book : null;
+    renderInspector(book);
+    renderBooks();
+
+    // If we were editing another book, reset form to normal
+    if (state.isEditing) exitEditMode();
+
+    if (state.selectedBook) return;
+    try {
+        const full = await fetchBook(book.id);
+        // Ignore the answer if another book was picked meanwhile
+        if (state.selectedId !== full.id) return;
+        state.selectedBook = full;
+        renderInspector(full);
+    } catch (err) {
+        showToast(err.message, "error");
+    }
+};
+
+const renderInspector = (book) => {
     // UI Updates
     els.inspectorPlaceholder.classList.add("hidden");
     els.inspectorContent.classList.remove("hidden");
@@ -233,7 +293,9 @@ const selectBook = (book) => {
     els.detailYear.textContent = book.year || "-";
     els.detailIsbn.textContent = book.isbn || "-";
     els.detailId.textContent = `#${book.id}`;
-    els.detailDesc.textContent = book.description || "Nenhuma descrição disponível para este volume.";
+    els.detailDesc.textContent = !("description" in book)
+        ? "Carregando..."
+        : book.description || "Nenhuma descrição disponível para este volume.";
     
     const statusCfg = STATUS_META[book.status] || STATUS_META.available;
     els.detailStatus.textContent = statusCfg.label;
@@ -247,15 +309,10 @@ const selectBook = (book) => {
         els.detailCoverImg.classList.add("hidden");
         els.detailCoverFallback.classList.remove("hidden");
     }
-
-    renderBooks();
-    
-    // If we were editing another book, reset form to normal
-    if (state.isEditing) exitEditMode();
 };
 
 const enterEditMode = () => {
-    const book = state.books.find(b => b.id === state.selectedId);
+    const book = state.selectedBook;
     if (!book) return;
 
     state.isEditing = true;
@@ -359,6 +416,7 @@ els.deleteBtn.onclick = async () => {
         await deleteBook(state.selectedId);
         showToast("Registro removido.");
         state.selectedId = null;
+        state.selectedBook = null;
         els.inspectorContent.classList.add("hidden");
         els.inspectorPlaceholder.classList.remove("hidden");
         els.selectedPill.classList.add("hidden");
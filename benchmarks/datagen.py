@@ -0,0 +1,166 @@
+"""Seeded catalog generator for the benchmarks.
+
+    python -m benchmarks.datagen --rows 1000000 --seed 42 --dir /tmp
+
+Builds a SQLite file with the app's schema (indexes, FTS and stats
+triggers included) and ``--rows`` deterministic books: the same rows and
+seed give the same data on every machine. Rows are written with the
+triggers dropped and the FTS index and book_stats counters rebuilt in one
+pass afterwards, then ANALYZE runs so the planner sees realistic stats.
+
+Files are named after rows, seed and a hash of the schema DDL, so a schema
+change (a new index, say) produces a fresh file instead of reusing a stale one.
+"""
+import argparse
+import hashlib
+import os
+import random
+import sqlite3
+import tempfile
+import time
+from datetime import datetime, timedelta
+from typing import Iterator, List, Optional, Tuple
+
+from sqlalchemy import create_engine
+from sqlalchemy.schema import CreateIndex, CreateTable
+
+from app.core.database import Base
+from app.models.book import (
+    BOOK_STATS_DDL,
+    BOOK_STATS_DIMENSIONS,
+    BOOKS_CREATED_AT_DDL,
+    BOOKS_FTS_DDL,
+    CATALOG_VERSION_DDL,
+)
+
+SYLLABLES = ["ka", "lo", "mi", "ren", "ta", "vo", "sul", "der", "an", "bri", "co", "est", "fa", "gu", "hel", "in"]
+LANGUAGES = [("en", 50), ("pt", 20), ("es", 10), ("fr", 5), ("de", 5), (None, 10)]
+STATUSES = [("AVAILABLE", 70), ("BORROWED", 20), ("RESERVED", 7), ("MAINTENANCE", 3)]
+INSERT_BATCH = 10000
+
+COLUMNS = (
+    "title", "author", "description", "year", "isbn", "cover_url", "language", "page_count", "status", "created_at"
+)
+
+
+class Vocabulary:
+    """Words and author names the generator draws from; queries draw from it too."""
+
+    def __init__(self, seed: int, rows: int):
+        rng = random.Random(f"vocabulary:{seed}")
+        words = set()
+        while len(words) < 400:
+            words.add("".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4))))
+        self.words: List[str] = sorted(words)
+        authors = set()
+        while len(authors) < max(100, min(rows // 20, 20000)):
+            authors.add(f"{rng.choice(self.words).title()} {rng.choice(self.words).title()}")
+        self.authors: List[str] = sorted(authors)
+
+    def author(self, rng: random.Random) -> str:
+        # Skewed: a few authors have many books, most have a handful
+        return self.authors[int(len(self.authors) * rng.random() ** 2)]
+
+
+def _weighted(rng: random.Random, choices):
+    values, weights = zip(*choices)
+    return rng.choices(values, weights)[0]
+
+
+def generate_rows(rows: int, seed: int, vocabulary: Vocabulary) -> Iterator[Tuple]:
+    rng = random.Random(seed)
+    start = datetime(2020, 1, 1)
+    for i in range(rows):
+        roll = rng.random()
+        year: Optional[int] = rng.randint(1900, 2024) if roll < 0.7 else rng.randint(1800, 1899) if roll < 0.9 else None
+        description = None
+        if rng.random() < 0.3:
+            description = " ".join(rng.choices(vocabulary.words, k=rng.randint(30, 90)))
+        yield (
+            " ".join(rng.choices(vocabulary.words, k=rng.randint(2, 5))).capitalize(),
+            vocabulary.author(rng),
+            description,
+            year,
+            # 7919 is coprime with 10**10, so the ISBNs never collide
+            f"978{(i * 7919) % 10**10:010d}" if rng.random() < 0.8 else None,
+            f"https://covers.example/{i}.jpg" if rng.random() < 0.5 else None,
+            _weighted(rng, LANGUAGES),
+            rng.randint(40, 1200) if rng.random() < 0.9 else None,
+            _weighted(rng, STATUSES),
+            (start + timedelta(seconds=i * 60 + rng.randint(0, 59))).strftime("%Y-%m-%d %H:%M:%S"),
+        )
+
+
+def schema_hash() -> str:
+    engine = create_engine("sqlite://")
+    ddl = [str(CreateTable(table).compile(engine)) for table in Base.metadata.sorted_tables]
+    # table.indexes is a set: sort so the hash is stable across processes
+    indexes = [index for table in Base.metadata.sorted_tables for index in table.indexes]
+    ddl += sorted(str(CreateIndex(index).compile(engine)) for index in indexes)
+    ddl += [*BOOKS_FTS_DDL, *BOOKS_CREATED_AT_DDL, *BOOK_STATS_DDL, *CATALOG_VERSION_DDL]
+    return hashlib.sha1("\n".join(ddl).encode()).hexdigest()[:8]
+
+
+def database_path(directory: str, rows: int, seed: int) -> str:
+    return os.path.join(directory, f"books-{rows}-s{seed}-{schema_hash()}.db")
+
+
+def build_database(path: str, rows: int, seed: int) -> None:
+    tmp_path = f"{path}.partial"
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+    engine = create_engine(f"sqlite:///{tmp_path}")
+    Base.metadata.create_all(engine)
+    engine.dispose()
+
+    conn = sqlite3.connect(tmp_path, isolation_level=None)
+    conn.execute("PRAGMA journal_mode=OFF")
+    conn.execute("PRAGMA synchronous=OFF")
+    triggers = [name for (name,) in conn.execute("SELECT name FROM sqlite_master WHERE type = 'trigger'")]
+    for name in triggers:
+        conn.execute(f"DROP TRIGGER {name}")
+
+    conn.execute("BEGIN")
+    insert = f"INSERT INTO books ({', '.join(COLUMNS)}) VALUES ({', '.join('?' * len(COLUMNS))})"
+    batch = []
+    for row in generate_rows(rows, seed, Vocabulary(seed, rows)):
+        batch.append(row)
+        if len(batch) >= INSERT_BATCH:
+            conn.executemany(insert, batch)
+            batch.clear()
+    if batch:
+        conn.executemany(insert, batch)
+
+    # Derived data in one pass each, then the triggers that maintain it
+    conn.execute("INSERT INTO books_fts(books_fts) VALUES ('rebuild')")
+    for name, expression in {"total": "''", **BOOK_STATS_DIMENSIONS}.items():
+        key = expression.format(row="books")
+        conn.execute(
+            f"INSERT INTO book_stats(dimension, key, count) SELECT '{name}', {key}, count(*) FROM books GROUP BY {key}"
+        )
+    for statement in (*BOOKS_FTS_DDL[1:], *BOOKS_CREATED_AT_DDL, *BOOK_STATS_DDL, *CATALOG_VERSION_DDL):
+        conn.execute(statement)
+    conn.execute("COMMIT")
+    conn.execute("ANALYZE")
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.close()
+    os.replace(tmp_path, path)
+
+
+def ensure_database(directory: str, rows: int, seed: int) -> str:
+    """Path of the seeded database for ``rows``/``seed``, building it on first use."""
+    path = database_path(directory, rows, seed)
+    if not os.path.exists(path):
+        build_database(path, rows, seed)
+    return path
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.datagen")
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--dir", default=tempfile.gettempdir())
+    args = parser.parse_args()
+    started = time.perf_counter()
+    path = ensure_database(args.dir, args.rows, args.seed)
+    print(f"{path} ready in {time.perf_counter() - started:.1f}s")
@@ -0,0 +1,105 @@
+"""Latency of single-row writes through the repository.
+
+    python -m benchmarks.mutations --ops 2000
+
+Runs ``--ops`` creates, updates, no-op updates and deletes one after
+another through a WriteQueue on a fresh database with the app's SQLite
+PRAGMAs, and reports per-operation latency and SQL statements sent on
+the writer connection (BEGIN included; COMMIT is not a statement here).
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+from typing import Awaitable, Callable, Dict, List
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from app.core.database import Base
+from app.core.sqlite import apply_sqlite_pragmas, sqlite_pragmas
+from app.core.writer import WriteQueue
+from app.repositories.book_repository import BookRepository
+
+
+async def _measure(ops: int, statements: List[str], op: Callable[[int], Awaitable]) -> Dict[str, float]:
+    latencies = []
+    statements.clear()
+    for i in range(ops):
+        start = time.perf_counter()
+        await op(i)
+        latencies.append((time.perf_counter() - start) * 1000)
+    latencies.sort()
+    return {
+        "mean": statistics.fmean(latencies),
+        "p50": latencies[len(latencies) // 2],
+        "p99": latencies[int(len(latencies) * 0.99)],
+        "statements": len(statements) / ops,
+    }
+
+
+async def main(args: argparse.Namespace) -> None:
+    path = os.path.join(tempfile.mkdtemp(prefix="bench-", dir=args.dir), "bench.db")
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}", poolclass=AsyncAdaptedQueuePool, pool_size=2)
+    pragmas = sqlite_pragmas(args.profile)
+    statements: List[str] = []
+
+    @event.listens_for(engine.sync_engine, "connect")
+    def _configure(dbapi_connection, connection_record):
+        apply_sqlite_pragmas(dbapi_connection, pragmas)
+        dbapi_connection.isolation_level = None
+
+    @event.listens_for(engine.sync_engine, "begin")
+    def _begin(conn):
+        conn.exec_driver_sql("BEGIN")
+
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def _count(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    session_factory = sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
+    writer = WriteQueue(session_factory)
+    async with session_factory() as session:
+        repo = BookRepository(session, writer)
+        books = []
+
+        async def create(i):
+            books.append(await repo.create(obj_in={"title": f"Benchmark title {i}", "author": f"Author {i % 97}"}))
+
+        async def update(i):
+            books[i] = await repo.update(db_obj=books[i], obj_in={"year": 1900 + i % 120})
+
+        async def unchanged(i):
+            await repo.update(db_obj=books[i], obj_in={"year": 1900 + i % 120})
+
+        async def delete(i):
+            await repo.delete(id=books[i].id)
+
+        results = {}
+        for name, op in (("create", create), ("update", update), ("no-op update", unchanged), ("delete", delete)):
+            results[name] = await _measure(args.ops, statements, op)
+
+    await writer.close()
+    await engine.dispose()
+
+    print(f"{'operation':<14}{'mean ms':>9}{'p50 ms':>9}{'p99 ms':>9}{'stmts/op':>10}")
+    for name, result in results.items():
+        print(
+            f"{name:<14}{result['mean']:>9.3f}{result['p50']:>9.3f}{result['p99']:>9.3f}"
+            f"{result['statements']:>10.1f}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.mutations")
+    parser.add_argument("--ops", type=int, default=2000)
+    parser.add_argument("--profile", default="durable", help="SQLite PRAGMA profile to apply")
+    parser.add_argument("--dir", help="Where to create the database (use the disk you deploy on)")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,281 @@
+"""Repository latency at catalog scale.
+
+    python -m benchmarks.repository --rows 10000 --rows 100000 --rows 1000000 --out bench.json
+
+For each ``--rows`` size a seeded catalog is built once by benchmarks.datagen
+(cached in ``--dir``) and copied to a scratch file, so every run starts from
+the same data. Each scenario then runs one repository call per iteration, in
+a fresh session like a request would, for ``--iterations`` calls or
+``--max-seconds``, whichever comes first, after a short warm-up:
+
+* list pages for every filter x sort x order the list endpoint accepts
+* deep OFFSET and keyset pages, counts, get by id / ISBN, batch get,
+  stats and facets
+* create, update and delete through a WriteQueue (run last, on the copy)
+
+The report (``--out``) records p50/p95/p99 latency and throughput per
+scenario with the git commit, SQLite version and profile; pass a previous
+report as ``--compare`` to print the change against it.
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import platform
+import random
+import re
+import shutil
+import sqlite3
+import subprocess
+import tempfile
+import time
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from app.core.sqlite import apply_sqlite_pragmas, sqlite_pragmas
+from app.core.writer import WriteQueue
+from app.repositories.book_repository import BookRepository
+from app.schemas.book import BOOK_FACETS
+from benchmarks.datagen import SYLLABLES, Vocabulary, ensure_database
+
+PAGE_SIZE = 20
+WARMUP = 3
+SORTS = ("title", "author", "year", "created_at")
+
+Operation = Callable[[BookRepository, random.Random], Awaitable[Any]]
+
+
+def _isbn(i: int) -> str:
+    # Same sequence as datagen; ~80% of these are in the catalog
+    return f"978{(i * 7919) % 10**10:010d}"
+
+
+def _filters(vocabulary: Vocabulary) -> Dict[str, Callable[[random.Random], dict]]:
+    def decade(rng: random.Random) -> dict:
+        start = rng.randrange(1900, 2020, 10)
+        return {"year_min": start, "year_max": start + 9}
+
+    return {
+        "all": lambda rng: {},
+        "q-fts": lambda rng: {"q": rng.choice(vocabulary.words)},
+        "q-short": lambda rng: {"q": rng.choice(SYLLABLES)[:2]},
+        "author": lambda rng: {"author": rng.choice(vocabulary.authors).split()[0]},
+        "year": lambda rng: {"year": rng.randint(1900, 2024)},
+        "year-range": decade,
+        "author+year-range": lambda rng: {"author": rng.choice(vocabulary.authors).split()[0], **decade(rng)},
+    }
+
+
+def _scenarios(rows: int, vocabulary: Vocabulary, anchors: List[Tuple[str, int]]) -> List[Tuple[str, Operation]]:
+    scenarios: List[Tuple[str, Operation]] = []
+    filters = _filters(vocabulary)
+    for name, params in filters.items():
+        for sort in SORTS:
+            for order in ("asc", "desc"):
+                def search(repo, rng, params=params, sort=sort, order=order):
+                    return repo.search_books(limit=PAGE_SIZE, sort=sort, order=order, **params(rng))
+
+                scenarios.append((f"search {name} {sort} {order}", search))
+
+    deep = lambda rng: rng.randrange(rows // 2, max(rows // 2 + 1, rows - PAGE_SIZE))
+    scenarios += [
+        ("deep offset", lambda repo, rng: repo.search_books(skip=deep(rng), limit=PAGE_SIZE, count="none")),
+        (
+            "deep keyset",
+            lambda repo, rng: repo.search_books(after=rng.choice(anchors), limit=PAGE_SIZE, count="none"),
+        ),
+        (
+            "count capped",
+            lambda repo, rng: repo.search_books(limit=PAGE_SIZE, count="capped", **filters["q-short"](rng)),
+        ),
+        ("count", lambda repo, rng: repo.count()),
+        ("get_multi", lambda repo, rng: repo.get_multi(skip=rng.randrange(rows), limit=PAGE_SIZE)),
+        ("get", lambda repo, rng: repo.get(rng.randint(1, rows))),
+        ("get_by_isbn", lambda repo, rng: repo.get_by_isbn(_isbn(rng.randrange(rows)))),
+        ("get_many 100", lambda repo, rng: repo.get_many(rng.sample(range(1, rows + 1), min(100, rows)))),
+        ("stats", lambda repo, rng: repo.get_stats()),
+        ("facets all", lambda repo, rng: repo.facet_counts(BOOK_FACETS)),
+        ("facets year-range", lambda repo, rng: repo.facet_counts(BOOK_FACETS, **filters["year-range"](rng))),
+    ]
+
+    created: List[int] = []
+
+    async def create(repo, rng):
+        payload = {"title": f"Benchmark {rng.random()}", "author": rng.choice(vocabulary.authors)}
+        book = await repo.create(obj_in=payload)
+        created.append(book.id)
+
+    async def update(repo, rng):
+        # Like the service: load the row, then write the change
+        book = await repo.get(rng.randint(1, rows))
+        await repo.update(db_obj=book, obj_in={"year": rng.randint(1900, 2024), "status": "BORROWED"})
+
+    async def delete(repo, rng):
+        await repo.delete(id=created.pop() if created else rows - rng.randrange(rows // 2))
+
+    scenarios += [("create", create), ("update", update), ("delete", delete)]
+    return scenarios
+
+
+def _percentile(latencies: List[float], p: float) -> float:
+    # Nearest rank on a sorted list
+    return latencies[max(0, math.ceil(p * len(latencies)) - 1)]
+
+
+async def _measure(session_factory, writer: WriteQueue, op: Operation, rng: random.Random, args) -> Dict[str, float]:
+    async def run() -> float:
+        async with session_factory() as session:
+            start = time.perf_counter()
+            await op(BookRepository(session, writer), rng)
+            return time.perf_counter() - start
+
+    for _ in range(WARMUP):
+        await run()
+    latencies: List[float] = []
+    started = time.perf_counter()
+    while len(latencies) < args.iterations and time.perf_counter() - started < args.max_seconds:
+        latencies.append(await run())
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    return {
+        "iterations": len(latencies),
+        "p50_ms": _percentile(latencies, 0.50) * 1000,
+        "p95_ms": _percentile(latencies, 0.95) * 1000,
+        "p99_ms": _percentile(latencies, 0.99) * 1000,
+        "mean_ms": sum(latencies) / len(latencies) * 1000,
+        "ops_per_s": len(latencies) / elapsed,
+    }
+
+
+def _anchors(path: str, rows: int, rng: random.Random) -> List[Tuple[str, int]]:
+    """(created_at, id) keysets deep into the default created_at-desc order."""
+    ids = [rng.randint(1, max(1, rows // 2)) for _ in range(50)]
+    with sqlite3.connect(path) as conn:
+        found = conn.execute(
+            f"SELECT created_at, id FROM books WHERE id IN ({', '.join('?' * len(ids))})", ids
+        ).fetchall()
+    return [tuple(row) for row in found]
+
+
+async def _run_size(rows: int, args: argparse.Namespace, pattern: Optional[re.Pattern]) -> Dict[str, Dict[str, float]]:
+    seed_path = ensure_database(args.dir, rows, args.seed)
+    path = os.path.join(tempfile.mkdtemp(prefix="bench-", dir=args.dir), "bench.db")
+    shutil.copyfile(seed_path, path)
+
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}", poolclass=AsyncAdaptedQueuePool, pool_size=2)
+    pragmas = sqlite_pragmas(args.profile)
+
+    @event.listens_for(engine.sync_engine, "connect")
+    def _configure(dbapi_connection, connection_record):
+        apply_sqlite_pragmas(dbapi_connection, pragmas)
+        dbapi_connection.isolation_level = None
+
+    @event.listens_for(engine.sync_engine, "begin")
+    def _begin(conn):
+        conn.exec_driver_sql("BEGIN")
+
+    session_factory = sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
+    writer = WriteQueue(session_factory)
+    vocabulary = Vocabulary(args.seed, rows)
+    scenarios = _scenarios(rows, vocabulary, _anchors(path, rows, random.Random(args.seed)))
+
+    results = {}
+    try:
+        for name, op in scenarios:
+            if pattern is not None and not pattern.search(name):
+                continue
+            # One stream per scenario, so results don't shift when others are skipped
+            rng = random.Random(f"{args.seed}:{name}")
+            results[name] = await _measure(session_factory, writer, op, rng, args)
+            print(f"  {rows:>8} {name:<44}{results[name]['p50_ms']:>9.3f} ms p50", flush=True)
+    finally:
+        await writer.close()
+        await engine.dispose()
+        shutil.rmtree(os.path.dirname(path), ignore_errors=True)
+    return results
+
+
+def _git(*command: str) -> Optional[str]:
+    try:
+        return subprocess.run(("git", *command), capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _metadata(args: argparse.Namespace) -> Dict[str, Any]:
+    status = _git("status", "--porcelain", "--untracked-files=no")
+    return {
+        "commit": _git("rev-parse", "HEAD"),
+        "dirty": bool(status) if status is not None else None,
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "seed": args.seed,
+        "profile": args.profile,
+        "iterations": args.iterations,
+        "max_seconds": args.max_seconds,
+        "sqlite": sqlite3.sqlite_version,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+    }
+
+
+def _delta(current: float, previous: Optional[float]) -> str:
+    if not previous:
+        return ""
+    return f"{(current - previous) / previous * 100:>+8.1f}%"
+
+
+def _print_report(report: Dict[str, Any], baseline: Optional[Dict[str, Any]]) -> None:
+    header = f"{'rows':>8} {'scenario':<44}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'ops/s':>9}"
+    if baseline is not None:
+        header += f"{'Δp50':>9}{'Δp95':>9}"
+        print(f"baseline: {baseline['meta'].get('commit')} ({baseline['meta'].get('timestamp')})")
+    print(header)
+    for rows, results in report["results"].items():
+        previous = (baseline or {}).get("results", {}).get(rows, {})
+        for name, result in results.items():
+            line = (
+                f"{rows:>8} {name:<44}{result['p50_ms']:>9.3f}{result['p95_ms']:>9.3f}"
+                f"{result['p99_ms']:>9.3f}{result['ops_per_s']:>9.0f}"
+            )
+            if name in previous:
+                line += _delta(result["p50_ms"], previous[name]["p50_ms"])
+                line += _delta(result["p95_ms"], previous[name]["p95_ms"])
+            print(line)
+
+
+async def main(args: argparse.Namespace) -> None:
+    pattern = re.compile(args.scenarios) if args.scenarios else None
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+    report: Dict[str, Any] = {"meta": _metadata(args), "results": {}}
+    for rows in args.rows or [10000]:
+        # JSON keys are strings; keep them that way so reports compare as loaded
+        report["results"][str(rows)] = await _run_size(rows, args, pattern)
+
+    _print_report(report, baseline)
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"report written to {args.out}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.repository")
+    parser.add_argument("--rows", type=int, action="append", help="Catalog size; repeat for several (default 10000)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--iterations", type=int, default=200, help="Timed calls per scenario")
+    parser.add_argument("--max-seconds", type=float, default=5.0, help="Time budget per scenario")
+    parser.add_argument("--scenarios", help="Only run scenarios matching this regex")
+    parser.add_argument("--profile", default="durable", help="SQLite PRAGMA profile to apply")
+    parser.add_argument("--dir", default=tempfile.gettempdir(), help="Where to cache seeded databases and run")
+    parser.add_argument("--out", help="Write the JSON report here")
+    parser.add_argument("--compare", help="Previous JSON report to diff against")
+    asyncio.run(main(parser.parse_args()))
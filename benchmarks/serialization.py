@@ -0,0 +1,69 @@
+"""Per-row cost of serializing a GET /books page.
+
+    python -m benchmarks.serialization --rows 100
+
+Compares FastAPI's response_model path (validate, serialize to Python,
+json.dumps) with dump_book_list (one validation, JSON dumped by
+pydantic-core) on the same ORM rows.
+"""
+import argparse
+import asyncio
+import time
+from datetime import datetime
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+
+from app.api.v1.endpoints.books import router
+from app.models.book import Book, BookStatus
+from app.schemas.book import dump_book_list
+
+
+def _books(count: int):
+    return [
+        Book(
+            id=i,
+            title=f"Benchmark title {i}",
+            author=f"Author {i % 997}",
+            description="A description long enough to look like a real one." if i % 2 else None,
+            year=1900 + i % 120,
+            isbn=f"978{i:010d}",
+            language="en",
+            page_count=100 + i % 400,
+            status=BookStatus.AVAILABLE,
+            created_at=datetime(2024, 1, 1, 12, 0, i % 60),
+            updated_at=datetime(2024, 2, 1, 12, 0, i % 60, 123456) if i % 3 else None,
+        )
+        for i in range(1, count + 1)
+    ]
+
+
+async def _response_model(field, books) -> bytes:
+    return JSONResponse(await serialize_response(field=field, response_content=books)).body
+
+
+async def main(args: argparse.Namespace) -> None:
+    field = next(route for route in router.routes if route.name == "read_books").response_field
+    books = _books(args.rows)
+    assert await _response_model(field, books) == dump_book_list(books)
+
+    results = {}
+    for name in ("response_model", "dump_book_list"):
+        start = time.perf_counter()
+        for _ in range(args.iterations):
+            if name == "response_model":
+                await _response_model(field, books)
+            else:
+                dump_book_list(books)
+        results[name] = (time.perf_counter() - start) / (args.iterations * args.rows) * 1e6
+
+    for name, per_row in results.items():
+        print(f"{name:<16}{per_row:>8.2f} us/row")
+    print(f"{'speedup':<16}{results['response_model'] / results['dump_book_list']:>8.2f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.serialization")
+    parser.add_argument("--rows", type=int, default=100)
+    parser.add_argument("--iterations", type=int, default=200)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,113 @@
+"""Mixed read/write throughput of each SQLite profile.
+
+    python -m benchmarks.sqlite_profiles --rows 20000 --seconds 5
+
+Every profile gets a fresh database file seeded with ``--rows`` books, then
+``--readers`` tasks run list queries while ``--writers`` tasks insert and
+update books through a WriteQueue for ``--seconds``. "default" is SQLite
+without any PRAGMAs; ``--group-commit`` batches concurrent writes.
+"""
+import argparse
+import asyncio
+import os
+import random
+import tempfile
+import time
+from typing import Dict, Optional
+
+from sqlalchemy import event, insert
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.core.database import Base
+from app.core.sqlite import SQLITE_PROFILES, apply_sqlite_pragmas, sqlite_pragmas
+from app.core.writer import WriteQueue
+from app.models.book import Book
+from app.repositories.book_repository import BookRepository
+
+
+def _book(i: int) -> dict:
+    return {"title": f"Benchmark title {i}", "author": f"Author {i % 997}", "year": 1900 + i % 120}
+
+
+async def _reader(session_factory, deadline: float, counts: Dict[str, int], rows: int) -> None:
+    while time.perf_counter() < deadline:
+        async with session_factory() as session:
+            repo = BookRepository(session)
+            try:
+                if random.random() < 0.5:
+                    await repo.get(random.randrange(1, rows))
+                else:
+                    await repo.search_books(limit=20, skip=random.randrange(rows - 20), sort="title", count="none")
+                counts["reads"] += 1
+            except OperationalError:
+                counts["errors"] += 1
+
+
+async def _writer(session_factory, writer: WriteQueue, deadline: float, counts: Dict[str, int], rows: int) -> None:
+    while time.perf_counter() < deadline:
+        async with session_factory() as session:
+            repo = BookRepository(session, writer)
+            try:
+                if random.random() < 0.5:
+                    await repo.create(obj_in=_book(random.randrange(rows)))
+                else:
+                    book = await repo.get(random.randrange(1, rows))
+                    if book is not None:
+                        await repo.update(db_obj=book, obj_in={"year": 1900 + random.randrange(120)})
+                counts["writes"] += 1
+            except OperationalError:
+                await session.rollback()
+                counts["errors"] += 1
+
+
+async def run_profile(profile: Optional[str], args: argparse.Namespace) -> Dict[str, float]:
+    path = os.path.join(tempfile.mkdtemp(prefix="bench-", dir=args.dir), "bench.db")
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}", poolclass=AsyncAdaptedQueuePool, pool_size=args.readers + args.writers)
+    pragmas = sqlite_pragmas(profile) if profile else {}
+
+    @event.listens_for(engine.sync_engine, "connect")
+    def _configure(dbapi_connection, connection_record):
+        apply_sqlite_pragmas(dbapi_connection, pragmas)
+        dbapi_connection.isolation_level = None
+
+    @event.listens_for(engine.sync_engine, "begin")
+    def _begin(conn):
+        conn.exec_driver_sql("BEGIN")
+
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        for start in range(0, args.rows, 5000):
+            await conn.execute(insert(Book), [_book(i) for i in range(start, min(args.rows, start + 5000))])
+
+    session_factory = sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
+    writer = WriteQueue(session_factory, group_commit=args.group_commit)
+    counts = {"reads": 0, "writes": 0, "errors": 0}
+    deadline = time.perf_counter() + args.seconds
+    await asyncio.gather(
+        *(_reader(session_factory, deadline, counts, args.rows) for _ in range(args.readers)),
+        *(_writer(session_factory, writer, deadline, counts, args.rows) for _ in range(args.writers)),
+    )
+    await writer.close()
+    await engine.dispose()
+    return {name: value / args.seconds for name, value in counts.items()}
+
+
+async def main(args: argparse.Namespace) -> None:
+    print(f"{'profile':<12}{'reads/s':>10}{'writes/s':>10}{'errors/s':>10}")
+    for profile in ["default", *SQLITE_PROFILES]:
+        result = await run_profile(None if profile == "default" else profile, args)
+        print(f"{profile:<12}{result['reads']:>10.0f}{result['writes']:>10.0f}{result['errors']:>10.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.sqlite_profiles")
+    parser.add_argument("--rows", type=int, default=20000)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--readers", type=int, default=8)
+    parser.add_argument("--writers", type=int, default=2)
+    parser.add_argument("--group-commit", action="store_true", help="Batch concurrent writes per transaction")
+    parser.add_argument("--dir", help="Where to create the databases (use the disk you deploy on)")
+    asyncio.run(main(parser.parse_args()))
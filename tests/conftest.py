@@ -0,0 +1,40 @@
+import asyncio
+
+import pytest
+import pytest_asyncio
+from httpx import AsyncClient, ASGITransport
+
+from app.core.database import Base, engine, write_queue
+from app.main import app
+
+
+def _run_on_schema(operation) -> None:
+    async def run():
+        async with engine.begin() as conn:
+            await conn.run_sync(operation)
+        # Pooled connections must not outlive this loop
+        await engine.dispose()
+
+    asyncio.run(run())
+
+
+@pytest.fixture(scope="module")
+def test_db():
+    # A fresh schema per test module. Synchronous: pytest-asyncio 0.23 cannot
+    # give a module-scoped async fixture in conftest.py an event loop.
+    _run_on_schema(Base.metadata.create_all)
+    yield
+    _run_on_schema(Base.metadata.drop_all)
+
+
+@pytest_asyncio.fixture
+async def client(test_db):
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+        yield ac
+
+
+@pytest_asyncio.fixture(autouse=True)
+async def stop_write_queue():
+    # Each test runs on its own event loop; stop the writer task before it closes.
+    yield
+    await write_queue.close()
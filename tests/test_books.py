@@ -1,22 +1,16 @@
-import pytest
-import pytest_asyncio
-from httpx import AsyncClient, ASGITransport
-from app.main import app
-from app.core.database import Base, engine
-
-# Fixture for the database
-@pytest_asyncio.fixture(scope="module")
-async def test_db():
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
-    yield
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.drop_all)
+import asyncio
+import csv
+import io
+import json
 
-@pytest_asyncio.fixture
-async def client(test_db):
-    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
-        yield ac
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import IntegrityError
+from app.core.config import settings
+from app.core.database import ReadSessionLocal, engine, write_queue
+from app.core.pagination import Cursor, encode_cursor
+from app.repositories.book_repository import BookRepository
+from app.services.book_service import BookService, facet_cache
 
 # Tests
 @pytest.mark.asyncio
@@ -98,3 +92,495 @@ async def test_search_books(client):
     assert response.status_code == 200
     titles = [book["title"] for book in response.json()]
     assert unique_title in titles
+
+@pytest.mark.asyncio
+async def test_cursor_pagination(client):
+    for i, year in enumerate([2001, 2001, None, 1999, 2001, None, 2010]):
+        await client.post(
+            "/api/v1/books/",
+            json={"title": f"Cursor Book {i}", "author": "Cursor Walker", "year": year},
+        )
+
+    for sort in ("title", "year", "created_at"):
+        for order in ("asc", "desc"):
+            params = {"author": "Cursor Walker", "sort": sort, "order": order}
+            full = await client.get("/api/v1/books/", params={**params, "limit": 100})
+            expected = [book["id"] for book in full.json()]
+
+            seen, cursor = [], None
+            while True:
+                page_params = {**params, "limit": 2}
+                if cursor:
+                    page_params["cursor"] = cursor
+                page = await client.get("/api/v1/books/", params=page_params)
+                assert page.status_code == 200
+                seen.extend(book["id"] for book in page.json())
+                cursor = page.headers.get("X-Next-Cursor")
+                if not cursor:
+                    break
+            assert seen == expected
+
+@pytest.mark.asyncio
+async def test_created_at_is_never_null(client):
+    # created_at keyset ranges would skip a NULL row, so writes cannot leave one
+    async def job(session):
+        result = await session.execute(
+            text("INSERT INTO books (title, author, status, created_at) VALUES ('No Date', 'Nobody', 'AVAILABLE', NULL)")
+        )
+        await session.execute(text("UPDATE books SET created_at = NULL WHERE author = 'Cursor Walker'"))
+        return result.lastrowid
+
+    book_id = await write_queue.submit(job)
+    async with ReadSessionLocal() as session:
+        missing = await session.scalar(text("SELECT count(*) FROM books WHERE created_at IS NULL"))
+        assert missing == 0
+    response = await client.get(f"/api/v1/books/{book_id}")
+    assert response.json()["created_at"]
+
+@pytest.mark.asyncio
+async def test_cursor_rejects_mismatch(client):
+    await client.post("/api/v1/books/", json={"title": "Mismatch A", "author": "Cursor Guard"})
+    await client.post("/api/v1/books/", json={"title": "Mismatch B", "author": "Cursor Guard"})
+    page = await client.get("/api/v1/books/", params={"author": "Cursor Guard", "limit": 1, "sort": "title"})
+    cursor = page.headers["X-Next-Cursor"]
+
+    response = await client.get("/api/v1/books/", params={"cursor": cursor, "sort": "year"})
+    assert response.status_code == 400
+    response = await client.get("/api/v1/books/", params={"cursor": "not-a-cursor"})
+    assert response.status_code == 400
+
+@pytest.mark.asyncio
+async def test_cursor_rejects_forged_values(client):
+    forged = [
+        Cursor(sort="created_at", order="desc", key="2024-01-01 00:00:00", id=10**30),
+        Cursor(sort="year", order="desc", key=10**30, id=1),
+        Cursor(sort="year", order="desc", key="1999", id=1),
+        Cursor(sort="title", order="asc", key=7, id=1),
+        Cursor(sort="title", order="asc", key=None, id=1),
+        Cursor(sort="title", order="asc", key="A", id=True),
+    ]
+    for cursor in forged:
+        params = {"cursor": encode_cursor(cursor), "sort": cursor.sort, "order": cursor.order}
+        response = await client.get("/api/v1/books/", params=params)
+        assert response.status_code == 400, cursor
+
+    # A NULL year is a real position
+    params = {"cursor": encode_cursor(Cursor(sort="year", order="asc", key=None, id=1)), "sort": "year", "order": "asc"}
+    response = await client.get("/api/v1/books/", params=params)
+    assert response.status_code == 200
+
+@pytest.mark.asyncio
+async def test_search_uses_fulltext_index(client):
+    create_res = await client.post(
+        "/api/v1/books/",
+        json={"title": "Memórias Póstumas", "author": "Machado de Assis", "year": 1881},
+    )
+    book_id = create_res.json()["id"]
+
+    for q in ("PÓSTUMAS", "rias pós", "chado de"):
+        response = await client.get("/api/v1/books/", params={"q": q})
+        assert book_id in [book["id"] for book in response.json()]
+
+    # The index follows updates and deletes through its triggers
+    await client.put(f"/api/v1/books/{book_id}", json={"title": "Dom Casmurro"})
+    response = await client.get("/api/v1/books/", params={"q": "Póstumas"})
+    assert book_id not in [book["id"] for book in response.json()]
+    response = await client.get("/api/v1/books/", params={"q": "casmurro"})
+    assert book_id in [book["id"] for book in response.json()]
+
+    await client.delete(f"/api/v1/books/{book_id}")
+    response = await client.get("/api/v1/books/", params={"q": "casmurro"})
+    assert response.headers["X-Total-Count"] == "0"
+
+@pytest.mark.asyncio
+async def test_bulk_create_books(client):
+    await client.post("/api/v1/books/", json={"title": "Stored", "author": "Bulk", "isbn": "111-222-333"})
+    items = [
+        {"title": "Bulk One", "author": "Bulk", "isbn": "444-555-666"},
+        {"title": "Bulk Two", "author": "Bulk", "isbn": "111222333"},
+        {"title": "Bulk Three", "author": "Bulk", "isbn": "444 555 666"},
+        {"title": "Bulk Four", "author": "Bulk"},
+    ]
+    response = await client.post("/api/v1/books/bulk", json=items)
+    assert response.status_code == 200
+    data = response.json()
+    assert data["created"] == 2
+    assert data["failed"] == 2
+
+    results = data["results"]
+    assert [result["index"] for result in results] == [0, 1, 2, 3]
+    assert results[0]["id"] is not None and results[3]["id"] is not None
+    assert results[1]["error"] == "ISBN already exists"
+    assert "Duplicate ISBN" in results[2]["error"]
+
+    created = await client.get(f"/api/v1/books/{results[0]['id']}")
+    assert created.json()["isbn"] == "444555666"
+
+@pytest.mark.asyncio
+async def test_bulk_create_validates_items_one_by_one(client):
+    items = [
+        {"title": "Mixed Invalid Year", "author": "Mixed", "year": 3000},
+        {"author": "Mixed"},
+        {"title": "Mixed Valid", "author": "Mixed", "isbn": "777-888-999"},
+        {"title": "Mixed Repeat", "author": "Mixed", "isbn": "777888999"},
+        {"title": "Mixed Also Valid", "author": "Mixed"},
+    ]
+    response = await client.post("/api/v1/books/bulk", json=items)
+    assert response.status_code == 200
+    data = response.json()
+    assert data["created"] == 2
+    assert data["failed"] == 3
+
+    results = data["results"]
+    assert [result["index"] for result in results] == [0, 1, 2, 3, 4]
+    assert results[0]["error"].startswith("year:")
+    assert results[1]["error"].startswith("title:")
+    assert results[2]["id"] is not None and results[4]["id"] is not None
+    assert results[3]["error"] == "Duplicate ISBN in batch (item 2)"
+
+@pytest.mark.asyncio
+async def test_bulk_create_reports_other_constraint_failures(client, monkeypatch):
+    create_many = BookRepository.create_many
+
+    async def reject_broken(self, *, rows):
+        # A constraint the request schema cannot catch, hit on the row-by-row retry too
+        if any(row["title"] == "Broken" for row in rows):
+            raise IntegrityError("INSERT INTO books", {}, Exception("CHECK constraint failed: books"))
+        return await create_many(self, rows=rows)
+
+    monkeypatch.setattr(BookRepository, "create_many", reject_broken)
+    items = [{"title": "Fine", "author": "Bulk"}, {"title": "Broken", "author": "Bulk"}]
+    response = await client.post("/api/v1/books/bulk", json=items)
+    assert response.status_code == 200
+    data = response.json()
+    assert data["created"] == 1
+    assert data["results"][0]["id"] is not None
+    assert data["results"][1]["error"] == "Integrity constraint violated"
+
+@pytest.mark.asyncio
+async def test_export_books(client, monkeypatch):
+    # Small windows so the export spans several read transactions
+    monkeypatch.setattr(settings, "EXPORT_CHUNK_SIZE", 2)
+    for i in range(3):
+        await client.post(
+            "/api/v1/books/",
+            json={"title": f"Export, \"Part\" {i}", "author": "Exporter", "year": 2000 + i},
+        )
+
+    response = await client.get("/api/v1/books/export", params={"author": "Exporter"})
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert [row["year"] for row in rows] == [2000, 2001, 2002]
+
+    response = await client.get(
+        "/api/v1/books/export", params={"author": "Exporter", "format": "csv", "gzip": "true", "year_min": 2001}
+    )
+    assert response.headers["content-encoding"] == "gzip"
+    records = list(csv.DictReader(io.StringIO(response.text)))
+    assert [record["title"] for record in records] == ['Export, "Part" 1', 'Export, "Part" 2']
+    assert records[0]["description"] == ""
+
+@pytest.mark.asyncio
+async def test_total_count_with_window_count(client, monkeypatch):
+    for i in range(3):
+        await client.post("/api/v1/books/", json={"title": f"Window {i}", "author": "Window Counter"})
+
+    for window_count in (True, False):
+        monkeypatch.setattr(settings, "LIST_WINDOW_COUNT", window_count)
+        for skip in (0, 2, 10):
+            response = await client.get("/api/v1/books/", params={"author": "Window Counter", "skip": skip, "limit": 1})
+            assert response.headers["X-Total-Count"] == "3"
+        page = await client.get("/api/v1/books/", params={"author": "Window Counter", "limit": 1})
+        page = await client.get(
+            "/api/v1/books/", params={"author": "Window Counter", "limit": 1, "cursor": page.headers["X-Next-Cursor"]}
+        )
+        assert page.headers["X-Total-Count"] == "3"
+
+@pytest.mark.asyncio
+async def test_total_count_modes(client, monkeypatch):
+    monkeypatch.setattr(settings, "LIST_COUNT_CAP", 2)
+    for i in range(4):
+        await client.post("/api/v1/books/", json={"title": f"Counted {i}", "author": "Count Mode"})
+    params = {"author": "Count Mode", "limit": 1}
+
+    response = await client.get("/api/v1/books/", params={**params, "count": "exact"})
+    assert response.headers["X-Total-Count"] == "4"
+    response = await client.get("/api/v1/books/", params={**params, "count": "capped"})
+    assert response.headers["X-Total-Count"] == "2+"
+    response = await client.get("/api/v1/books/", params={**params, "count": "estimate"})
+    assert response.headers["X-Total-Count"] == "2+"
+    for limit in (1, 10):
+        response = await client.get("/api/v1/books/", params={**params, "limit": limit, "count": "none"})
+        assert "X-Total-Count" not in response.headers
+
+    # A short page already knows its total, even one of exactly cap + 1 rows
+    monkeypatch.setattr(settings, "LIST_COUNT_CAP", 5)
+    response = await client.get("/api/v1/books/", params={**params, "limit": 10, "count": "capped"})
+    assert response.headers["X-Total-Count"] == "4"
+    monkeypatch.setattr(settings, "LIST_COUNT_CAP", 3)
+    for mode in ("capped", "estimate"):
+        response = await client.get("/api/v1/books/", params={**params, "limit": 10, "count": mode})
+        assert response.headers["X-Total-Count"] == "4"
+
+    # Unfiltered estimates come from the book_stats total: never capped, never stale
+    response = await client.get("/api/v1/books/", params={"limit": 1, "count": "estimate"})
+    exact = await client.get("/api/v1/books/", params={"limit": 1, "count": "exact"})
+    assert int(response.headers["X-Total-Count"]) > 5
+    assert response.headers["X-Total-Count"] == exact.headers["X-Total-Count"]
+    await client.post("/api/v1/books/", json={"title": "Counted 4", "author": "Count Mode"})
+    response = await client.get("/api/v1/books/", params={"limit": 1, "count": "estimate"})
+    assert int(response.headers["X-Total-Count"]) == int(exact.headers["X-Total-Count"]) + 1
+    async with ReadSessionLocal() as session:
+        assert await BookRepository(session)._estimated_row_count() == int(response.headers["X-Total-Count"])
+    # ... and not mistaken for a capped count when it lands on cap + 1
+    monkeypatch.setattr(settings, "LIST_COUNT_CAP", int(response.headers["X-Total-Count"]) - 1)
+    again = await client.get("/api/v1/books/", params={"limit": 1, "count": "estimate"})
+    assert again.headers["X-Total-Count"] == response.headers["X-Total-Count"]
+
+@pytest.mark.asyncio
+async def test_book_etag(client):
+    create_res = await client.post("/api/v1/books/", json={"title": "Tagged", "author": "ETag"})
+    book_id = create_res.json()["id"]
+
+    first = await client.get(f"/api/v1/books/{book_id}")
+    etag = first.headers["ETag"]
+    cached = await client.get(f"/api/v1/books/{book_id}", headers={"If-None-Match": etag})
+    assert cached.status_code == 304
+    assert cached.headers["ETag"] == etag
+
+    # Two updates within the same second still get distinct tags
+    seen = {etag}
+    for title in ("Tagged again", "Tagged twice"):
+        await client.put(f"/api/v1/books/{book_id}", json={"title": title})
+        response = await client.get(f"/api/v1/books/{book_id}", headers={"If-None-Match": etag})
+        assert response.status_code == 200
+        assert response.json()["title"] == title
+        etag = response.headers["ETag"]
+        assert etag not in seen
+        seen.add(etag)
+
+@pytest.mark.asyncio
+async def test_book_etag_after_id_reuse(client):
+    first = await client.post("/api/v1/books/", json={"title": "Reused", "author": "ETag"})
+    book_id = first.json()["id"]
+    etag = (await client.get(f"/api/v1/books/{book_id}")).headers["ETag"]
+
+    # SQLite gives the next insert the id of a deleted newest row
+    await client.delete(f"/api/v1/books/{book_id}")
+    second = await client.post("/api/v1/books/", json={"title": "Replacement", "author": "ETag"})
+    assert second.json()["id"] == book_id
+
+    response = await client.get(f"/api/v1/books/{book_id}", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.json()["title"] == "Replacement"
+    assert response.headers["ETag"] != etag
+
+@pytest.mark.asyncio
+async def test_collection_etag(client):
+    params = {"author": "Collection Tag"}
+    await client.post("/api/v1/books/", json={"title": "Listed", "author": "Collection Tag"})
+    first = await client.get("/api/v1/books/", params=params)
+    etag = first.headers["ETag"]
+
+    cached = await client.get("/api/v1/books/", params=params, headers={"If-None-Match": etag})
+    assert cached.status_code == 304
+    other = await client.get("/api/v1/books/", params={**params, "limit": 5}, headers={"If-None-Match": etag})
+    assert other.status_code == 200
+
+    # Any committed write invalidates collection tags
+    await client.post("/api/v1/books/", json={"title": "Listed too", "author": "Collection Tag"})
+    fresh = await client.get("/api/v1/books/", params=params, headers={"If-None-Match": etag})
+    assert fresh.status_code == 200
+    assert len(fresh.json()) == 2
+
+    # So does a write from outside the app's sessions, e.g. another process
+    etag = fresh.headers["ETag"]
+    async with engine.begin() as conn:
+        await conn.execute(text("UPDATE books SET year = 1999 WHERE title = 'Listed too'"))
+    changed = await client.get("/api/v1/books/", params=params, headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert 1999 in [book["year"] for book in changed.json()]
+
+@pytest.mark.asyncio
+async def test_sparse_fieldsets(client):
+    params = {"author": "Sparse Author", "fields": "year, title,id"}
+    for year in (2001, 2002, 2003):
+        await client.post(
+            "/api/v1/books/",
+            json={"title": f"Sparse {year}", "author": "Sparse Author", "year": year, "description": "long text"},
+        )
+
+    response = await client.get("/api/v1/books/", params={**params, "limit": 2, "sort": "year", "order": "asc"})
+    assert response.status_code == 200
+    assert response.json() == [
+        {"title": "Sparse 2001", "year": 2001, "id": response.json()[0]["id"]},
+        {"title": "Sparse 2002", "year": 2002, "id": response.json()[1]["id"]},
+    ]
+    assert list(response.json()[0]) == ["title", "year", "id"]
+    assert response.headers["X-Total-Count"] == "3"
+    # Keyset paging still works when the sort column is not selected
+    next_page = await client.get(
+        "/api/v1/books/",
+        params={"author": "Sparse Author", "fields": "title", "sort": "year", "order": "asc",
+                "cursor": response.headers["X-Next-Cursor"]},
+    )
+    assert next_page.json() == [{"title": "Sparse 2003"}]
+
+    book_id = response.json()[0]["id"]
+    detail = await client.get(f"/api/v1/books/{book_id}", params={"fields": "description"})
+    assert detail.json() == {"description": "long text"}
+    full = await client.get(f"/api/v1/books/{book_id}")
+    assert detail.headers["ETag"] != full.headers["ETag"]
+    cached = await client.get(
+        f"/api/v1/books/{book_id}", params={"fields": "description"}, headers={"If-None-Match": detail.headers["ETag"]}
+    )
+    assert cached.status_code == 304
+
+    for bad in ("title,isbnx", ","):
+        assert (await client.get("/api/v1/books/", params={"fields": bad})).status_code == 400
+        assert (await client.get(f"/api/v1/books/{book_id}", params={"fields": bad})).status_code == 400
+
+@pytest.mark.asyncio
+async def test_duplicate_isbn_is_rejected_under_concurrency(client, monkeypatch):
+    async def slow_lookup(self, isbn):
+        # Every request gets past any pre-check before the first one writes
+        await asyncio.sleep(0.05)
+        return {}
+
+    monkeypatch.setattr(BookService, "fetch_book_by_isbn", slow_lookup)
+    book = {"author": "Racer", "isbn": "978-0-00-000000-2"}
+    responses = await asyncio.gather(
+        *(client.post("/api/v1/books/", json={**book, "title": f"Race {i}"}) for i in range(10))
+    )
+    codes = sorted(response.status_code for response in responses)
+    assert codes == [201] + [400] * 9
+    assert all(r.json()["detail"] == "ISBN already exists" for r in responses if r.status_code == 400)
+
+    other = await client.post("/api/v1/books/", json={**book, "title": "Other", "isbn": "978-0-00-000000-3"})
+    conflict = await client.put(f"/api/v1/books/{other.json()['id']}", json={"isbn": "9780000000002"})
+    assert conflict.status_code == 400
+    assert conflict.json()["detail"] == "ISBN already exists"
+
+@pytest.mark.asyncio
+async def test_batch_get_books(client, monkeypatch):
+    ids = []
+    for i in range(3):
+        response = await client.post("/api/v1/books/", json={"title": f"Batch {i}", "author": "Batcher"})
+        ids.append(response.json()["id"])
+
+    # Small IN chunks so the request spans several queries
+    monkeypatch.setattr("app.repositories.book_repository.IN_CLAUSE_CHUNK_SIZE", 2)
+    requested = [ids[2], 999999, ids[0], ids[2], ids[1]]
+    response = await client.post("/api/v1/books/batch-get", json={"ids": requested})
+    assert response.status_code == 200
+    data = response.json()
+    assert [book["id"] for book in data["books"]] == [ids[2], ids[0], ids[1]]
+    assert data["books"][0]["title"] == "Batch 2"
+    assert data["missing"] == [999999]
+
+    monkeypatch.setattr(settings, "BATCH_GET_MAX_IDS", 2)
+    response = await client.post("/api/v1/books/batch-get", json={"ids": requested})
+    assert response.status_code == 413
+    response = await client.post("/api/v1/books/batch-get", json={"ids": []})
+    assert response.status_code == 422
+    response = await client.post("/api/v1/books/batch-get", json={"ids": [ids[0], 2**63]})
+    assert response.status_code == 422
+
+@pytest.mark.asyncio
+async def test_catalog_stats(client):
+    before = (await client.get("/api/v1/books/stats")).json()
+    books = [
+        {"title": "Stats A", "author": "Counter", "year": 1001, "language": "Klingon", "isbn": "stats-1",
+         "description": "d", "cover_url": "http://c"},
+        {"title": "Stats B", "author": "Counter", "year": 2099, "language": "Klingon", "status": "borrowed"},
+        {"title": "Stats C", "author": "Counter"},
+    ]
+    ids = [(await client.post("/api/v1/books/", json=book)).json()["id"] for book in books]
+    await client.put(f"/api/v1/books/{ids[2]}", json={"status": "reserved", "language": "Vulcan"})
+    await client.delete(f"/api/v1/books/{ids[1]}")
+    await client.post("/api/v1/books/bulk", json=[{"title": "Stats D", "author": "Counter", "language": "Vulcan"}])
+
+    stats = (await client.get("/api/v1/books/stats")).json()
+    assert stats["total"] == before["total"] + 3
+    assert stats["by_status"]["reserved"] == before["by_status"]["reserved"] + 1
+    assert stats["by_status"]["borrowed"] == before["by_status"]["borrowed"]
+    assert stats["year_min"] == 1001
+    assert stats["with_isbn"] == before["with_isbn"] + 1
+    assert stats["isbn_coverage"] == round(stats["with_isbn"] / stats["total"], 4)
+    languages = {entry["language"]: entry["count"] for entry in stats["by_language"]}
+    assert languages["Klingon"] == 1 and languages["Vulcan"] == 2
+    assert sum(languages.values()) == stats["total"]
+
+    # The counters agree with aggregating the table itself
+    async with ReadSessionLocal() as session:
+        repo = BookRepository(session)
+        aggregated = {}
+        for dimension, key, count in (await session.execute(repo._aggregate_stats())).all():
+            aggregated.setdefault(dimension, {})[key] = count
+        assert await repo.get_stats() == aggregated
+
+@pytest.mark.asyncio
+async def test_facets(client):
+    books = [
+        {"year": 1984, "language": "en"},
+        {"year": 1989, "language": "en", "status": "borrowed"},
+        {"year": 2001, "language": "pt"},
+        {"status": "borrowed"},
+    ]
+    for i, book in enumerate(books):
+        await client.post("/api/v1/books/", json={"title": f"Facet {i}", "author": "Facet Author", **book})
+
+    params = {"author": "facet author", "facets": "decade,status,language", "limit": 1}
+    response = await client.get("/api/v1/books/", params=params)
+    assert response.status_code == 200
+    facets = json.loads(response.headers["X-Facets"])
+    assert list(facets) == ["decade", "status", "language"]
+    assert facets["decade"] == [{"value": 1980, "count": 2}, {"value": 2000, "count": 1}, {"value": None, "count": 1}]
+    assert facets["status"] == [{"value": "available", "count": 2}, {"value": "borrowed", "count": 2}]
+    assert facets["language"] == [{"value": "en", "count": 2}, {"value": "pt", "count": 1}, {"value": None, "count": 1}]
+
+    # Served from the cache until the next write
+    hits = facet_cache.hits
+    await client.get("/api/v1/books/", params={**params, "author": "Facet Author", "limit": 5})
+    assert facet_cache.hits == hits + 1
+    await client.post("/api/v1/books/", json={"title": "Facet 4", "author": "Facet Author", "year": 2005})
+    response = await client.get("/api/v1/books/", params={**params, "facets": "decade"})
+    assert {"value": 2000, "count": 2} in json.loads(response.headers["X-Facets"])["decade"]
+    # Writes outside the app's sessions retire the entries too
+    async with engine.begin() as conn:
+        await conn.execute(text("UPDATE books SET year = 2011 WHERE title = 'Facet 4'"))
+    response = await client.get("/api/v1/books/", params={**params, "facets": "decade"})
+    assert {"value": 2010, "count": 1} in json.loads(response.headers["X-Facets"])["decade"]
+
+    # Unfiltered facets come from the book_stats counters and match a full scan
+    async with ReadSessionLocal() as session:
+        repo = BookRepository(session)
+        facets = ["status", "language", "decade"]
+        assert await repo.facet_counts(facets) == await repo._scan_facets(facets, [])
+
+    assert "X-Facets" not in (await client.get("/api/v1/books/")).headers
+    assert (await client.get("/api/v1/books/", params={"facets": "status,color"})).status_code == 400
+
+@pytest.mark.asyncio
+async def test_facets_are_capped(client, monkeypatch):
+    # language is free text: rare values fold into "other" so the header stays small
+    languages = ["só-uma", "só-uma", "só-uma", *(f"língua-{i:02d}-" + "ç" * 40 for i in range(40))]
+    for i, language in enumerate(languages):
+        await client.post("/api/v1/books/", json={"title": f"Babel {i}", "author": "Babel", "language": language})
+
+    monkeypatch.setattr(settings, "FACET_MAX_VALUES", 2)
+    response = await client.get("/api/v1/books/", params={"author": "Babel", "facets": "language,status"})
+    facets = json.loads(response.headers["X-Facets"])
+    assert facets["language"][0] == {"value": "só-uma", "count": 3}
+    assert facets["language"][2] == {"other": True, "count": 39}
+    assert len(facets["language"]) == 3
+    assert facets["status"] == [{"value": "available", "count": 43}]
+
+    monkeypatch.setattr(settings, "FACET_MAX_VALUES", 100)
+    monkeypatch.setattr(settings, "FACET_HEADER_MAX_BYTES", 1000)
+    response = await client.get("/api/v1/books/", params={"author": "babel", "facets": "language"})
+    assert len(response.headers["X-Facets"]) <= 1000
+    language = json.loads(response.headers["X-Facets"])["language"]
+    assert language[-1]["other"] is True
+    assert sum(item["count"] for item in language) == 43
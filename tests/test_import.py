@@ -0,0 +1,81 @@
+import json
+
+import pytest
+from app.core.config import settings
+from app.services.book_service import BookService
+from app.services.import_service import BookImportService
+
+CSV_ROWS = (
+    "title,author,year,isbn,description\n"
+    "Import One,Importer,2001,900-001,\n"
+    "\"Import, Two\",Importer,2002,900-002,\"spans\n"
+    "two lines\"\n"
+    "Import Three,Importer,not-a-year,900-003,\n"
+    "Import Four,Importer,2004,900001,\n"
+    "Import Five,Importer,2005,900-005,\n"
+)
+
+@pytest.mark.asyncio
+async def test_import_csv_reports_rejects(test_db, tmp_path):
+    path = tmp_path / "books.csv"
+    path.write_text(CSV_ROWS)
+    importer = BookImportService(chunk_size=2)
+    await importer.create_job("csv-report", str(path), "csv")
+
+    report = await importer.run("csv-report")
+    assert report.status == "completed"
+    assert report.rows_read == 5
+    assert report.rows_imported == 3
+    assert [(reject.line, reject.error.split(":")[0]) for reject in report.rejects] == [
+        (5, "year"),
+        (6, "ISBN already exists"),
+    ]
+    assert report.byte_offset == path.stat().st_size
+
+@pytest.mark.asyncio
+async def test_import_resumes_after_last_committed_chunk(test_db, tmp_path, monkeypatch):
+    path = tmp_path / "books.ndjson"
+    path.write_text("".join(
+        json.dumps({"title": f"Resume {i}", "author": "Resumer", "isbn": f"910-{i:03d}"}) + "\n"
+        for i in range(5)
+    ))
+    importer = BookImportService(chunk_size=2)
+    await importer.create_job("ndjson-resume", str(path), "ndjson")
+
+    original = BookService.partition_new_books
+    calls = 0
+
+    async def crash_on_second_chunk(self, payloads):
+        nonlocal calls
+        calls += 1
+        if calls == 2:
+            raise RuntimeError("worker died")
+        return await original(self, payloads)
+
+    monkeypatch.setattr(BookService, "partition_new_books", crash_on_second_chunk)
+    report = await importer.run("ndjson-resume")
+    assert report.status == "failed"
+    assert report.rows_imported == 2
+
+    monkeypatch.setattr(BookService, "partition_new_books", original)
+    report = await importer.run("ndjson-resume")
+    assert report.status == "completed"
+    assert report.rows_imported == 5
+    assert report.rows_rejected == 0
+
+@pytest.mark.asyncio
+async def test_import_endpoint(client, tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "IMPORT_DIR", str(tmp_path))
+    body = "\n".join(json.dumps({"title": f"Upload {i}", "author": "Uploader"}) for i in range(3))
+    response = await client.post(
+        "/api/v1/books/import", params={"format": "ndjson", "job_id": "upload-1"}, content=body
+    )
+    assert response.status_code == 202
+
+    report = (await client.get("/api/v1/books/import/upload-1")).json()
+    assert report["status"] == "completed"
+    assert report["rows_imported"] == 3
+    assert (tmp_path / "upload-1.ndjson").exists()
+
+    response = await client.post("/api/v1/books/import", params={"format": "ndjson", "job_id": "upload-1"}, content=body)
+    assert response.status_code == 409
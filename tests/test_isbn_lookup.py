@@ -0,0 +1,98 @@
+import asyncio
+
+import httpx
+import pytest
+
+from app.core import http
+from app.core.metrics import openlibrary_errors
+from app.services.book_service import BookService, isbn_cache
+
+OPENLIBRARY_PAYLOAD = {
+    "ISBN:9780132350884": {
+        "title": "Clean Code",
+        "authors": [{"name": "Robert C. Martin"}],
+        "publish_date": "August 2008",
+        "number_of_pages": 431,
+    }
+}
+
+
+@pytest.fixture(autouse=True)
+def clear_isbn_cache():
+    isbn_cache.clear()
+    yield
+    isbn_cache.clear()
+
+
+def make_service(handler) -> BookService:
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return BookService(db=None, http_client=client)
+
+
+@pytest.mark.asyncio
+async def test_lookup_parses_openlibrary_payload():
+    requests = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        return httpx.Response(200, json=OPENLIBRARY_PAYLOAD)
+
+    service = make_service(handler)
+    data = await service.fetch_book_by_isbn("978-0132350884")
+    assert data["title"] == "Clean Code"
+    assert data["author"] == "Robert C. Martin"
+    assert data["year"] == 2008
+    assert requests[0].url.params["bibkeys"] == "ISBN:9780132350884"
+
+
+@pytest.mark.asyncio
+async def test_shared_http_client_is_reused():
+    client = http.get_http_client()
+    assert http.get_http_client() is client
+    await http.close_http_client()
+    assert client.is_closed
+    assert http.get_http_client() is not client
+    await http.close_http_client()
+
+
+@pytest.mark.asyncio
+async def test_lookup_results_are_cached_including_misses():
+    calls = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request.url.params["bibkeys"])
+        return httpx.Response(200, json=OPENLIBRARY_PAYLOAD)
+
+    service = make_service(handler)
+    assert (await service.fetch_book_by_isbn("9780132350884"))["title"] == "Clean Code"
+    assert (await service.fetch_book_by_isbn("978 0132 350884"))["title"] == "Clean Code"
+    assert await service.fetch_book_by_isbn("0000000000") == {}
+    assert await service.fetch_book_by_isbn("000-000-0000") == {}
+    assert calls == ["ISBN:9780132350884", "ISBN:0000000000"]
+
+
+@pytest.mark.asyncio
+async def test_lookup_failures_are_not_cached():
+    responses = iter([httpx.Response(503), httpx.Response(200, json=OPENLIBRARY_PAYLOAD)])
+    service = make_service(lambda request: next(responses))
+
+    errors = openlibrary_errors.value("HTTPStatusError")
+    assert await service.fetch_book_by_isbn("9780132350884") == {}
+    assert openlibrary_errors.value("HTTPStatusError") == errors + 1
+    assert (await service.fetch_book_by_isbn("9780132350884"))["title"] == "Clean Code"
+
+
+@pytest.mark.asyncio
+async def test_concurrent_lookups_are_coalesced():
+    calls = 0
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return httpx.Response(200, json=OPENLIBRARY_PAYLOAD)
+
+    service = make_service(handler)
+    results = await asyncio.gather(*(service.fetch_book_by_isbn("9780132350884") for _ in range(10)))
+    assert calls == 1
+    assert all(result["title"] == "Clean Code" for result in results)
@@ -0,0 +1,62 @@
+import pytest
+
+from app.core.database import engine
+from app.core.metrics import Histogram, Registry, db_pool_checkout_wait, db_statement_duration
+from app.services.book_service import isbn_cache
+
+
+def test_text_format():
+    registry = Registry()
+    latency = registry.histogram("latency_seconds", "Latency.", ("route",), buckets=(0.1, 1.0))
+    errors = registry.counter("errors_total", "Errors.", ("kind",))
+    for value in (0.05, 0.1, 0.5, 3.0):
+        latency.observe(value, '/a"b')
+    errors.inc("Timeout")
+    errors.inc("Timeout", amount=2)
+
+    assert registry.render().splitlines() == [
+        "# HELP latency_seconds Latency.",
+        "# TYPE latency_seconds histogram",
+        'latency_seconds_bucket{route="/a\\"b",le="0.1"} 2',
+        'latency_seconds_bucket{route="/a\\"b",le="1"} 3',
+        'latency_seconds_bucket{route="/a\\"b",le="+Inf"} 4',
+        'latency_seconds_sum{route="/a\\"b"} 3.65',
+        'latency_seconds_count{route="/a\\"b"} 4',
+        "# HELP errors_total Errors.",
+        "# TYPE errors_total counter",
+        'errors_total{kind="Timeout"} 3',
+    ]
+
+@pytest.mark.asyncio
+async def test_metrics_endpoint(client):
+    selects = db_statement_duration.count("read", "SELECT")
+    checkouts = db_pool_checkout_wait.count("read")
+    created = await client.post("/api/v1/books/", json={"title": "Measured", "author": "Metrics"})
+    await client.get(f"/api/v1/books/{created.json()['id']}")
+    await client.get("/api/v1/books/999999")
+    isbn_cache.get("metrics-probe")
+
+    response = await client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    body = response.text
+    # Labelled by route template, not by the requested path
+    assert 'http_request_duration_seconds_count{method="GET",route="/api/v1/books/{book_id}",status="200"} ' in body
+    assert 'http_request_duration_seconds_count{method="GET",route="/api/v1/books/{book_id}",status="404"} ' in body
+    assert 'route="/api/v1/books/999999"' not in body
+    assert "http_requests_in_flight 1" in body
+    assert 'db_statement_duration_seconds_count{engine="write",operation="INSERT"} ' in body
+    # Read from the cache's own counters, the same numbers /health/cache reports
+    stats = isbn_cache.stats()
+    assert stats["misses"] >= 1
+    for name in ("hits", "misses", "evictions"):
+        assert f'cache_{name}_total{{cache="isbn_lookup"}} {stats[name]}\n' in body
+    if engine.sync_engine.pool.__class__.__name__ == "TimedQueuePool":
+        assert db_statement_duration.count("read", "SELECT") >= selects + 2
+        assert db_pool_checkout_wait.count("read") >= checkouts + 2
+
+def test_histogram_bucket_edges():
+    histogram = Histogram("h", "H.", buckets=(1.0, 2.0))
+    histogram.observe(1.0)
+    histogram.observe(2.5)
+    assert histogram.samples()[:3] == ['h_bucket{le="1"} 1', 'h_bucket{le="2"} 1', 'h_bucket{le="+Inf"} 2']
@@ -0,0 +1,59 @@
+import itertools
+import re
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.dialects import sqlite
+
+from app.core.database import ReadSessionLocal
+from app.repositories.book_repository import SORT_KEYS, BookRepository
+
+FILTERS = [
+    {},
+    {"q": "gatsby"},
+    {"author": "fitzgerald"},
+    {"year": 1925},
+    {"year_min": 1900, "year_max": 1950},
+    {"q": "gatsby", "year_min": 1900},
+    {"author": "fitzgerald", "year": 1925},
+]
+CURSORS = {
+    "title": [("M", 10)],
+    "author": [("M", 10)],
+    "year": [(1925, 10), (None, 10)],
+    "created_at": [("2024-01-01 00:00:00", 10)],
+}
+
+
+def _scans_books(step: str) -> bool:
+    # "SCAN books USING INDEX ..." too, but not the FTS table "SCAN books_fts ..."
+    return step == "SCAN books" or step.startswith("SCAN books ")
+
+
+async def _plan(session, stmt) -> list:
+    sql = stmt.compile(dialect=sqlite.dialect(), compile_kwargs={"literal_binds": True})
+    result = await session.execute(text(f"EXPLAIN QUERY PLAN {sql}"))
+    return [row[-1] for row in result.all()]
+
+
+@pytest.mark.asyncio
+async def test_every_list_query_uses_an_index(test_db):
+    async with ReadSessionLocal() as session:
+        repo = BookRepository(session)
+        for filters, sort, order in itertools.product(FILTERS, SORT_KEYS, ("asc", "desc")):
+            for after in [None, *CURSORS[sort]]:
+                statements = repo.page_statements(**filters, sort=sort, order=order, after=after, limit=20)
+                for stmt in statements:
+                    plan = await _plan(session, stmt)
+                    case = (filters, sort, order, after, plan)
+                    assert "SCAN books" not in plan, case  # a full table scan
+                    if not filters:
+                        assert not any("TEMP B-TREE" in step for step in plan), case
+                    if after is None:
+                        continue
+                    # A cursor page seeks; even a walk over a whole index is a regression
+                    assert not any(_scans_books(step) for step in plan), case
+                    assert any(step.startswith("SEARCH books ") for step in plan), case
+                    if not filters:
+                        seek = re.compile(rf"^SEARCH books USING (COVERING )?INDEX ix_books_{sort}\w* \({sort}[<>=]")
+                        assert any(seek.match(step) for step in plan), case
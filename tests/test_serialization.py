@@ -0,0 +1,39 @@
+from datetime import datetime
+
+import pytest
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+
+from app.api.v1.endpoints.books import router
+from app.models.book import Book, BookStatus
+from app.schemas.book import dump_book_list
+
+
+def _books():
+    return [
+        Book(
+            id=1,
+            title="Memórias Póstumas \"de\" Brás Cubas   \x1f",
+            author="Machado de Assis",
+            description=None,
+            year=1881,
+            isbn="9788535910667",
+            cover_url="https://covers.example/1.jpg?a=1&b=/2",
+            language="pt",
+            page_count=368,
+            status=BookStatus.BORROWED,
+            created_at=datetime(2024, 1, 2, 3, 4, 5),
+            updated_at=datetime(2024, 5, 6, 7, 8, 9, 123456),
+        ),
+        Book(id=2, title="飛ぶ教室 🚀", author="Kästner", status=BookStatus.AVAILABLE, created_at=datetime(2024, 1, 1)),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_fast_list_json_matches_response_model():
+    route = next(route for route in router.routes if route.name == "read_books")
+    books = _books()
+    content = await serialize_response(field=route.response_field, response_content=books)
+    expected = JSONResponse(content).body
+
+    assert dump_book_list(books) == expected
@@ -0,0 +1,43 @@
+import logging
+import re
+
+import pytest
+
+from app.core.database import ReadSessionLocal, engine, slow_query_log
+from app.core.slow_query import redact, statement_shape
+from app.repositories.book_repository import BookRepository
+
+
+def test_statement_shape_and_redaction():
+    assert statement_shape("SELECT *\n  FROM books WHERE id IN (?, ?,?)") == "SELECT * FROM books WHERE id IN (?, ...)"
+    assert statement_shape("SELECT 1 WHERE id IN (?)") == "SELECT 1 WHERE id IN (?)"
+    assert redact(("Secret Title", 1999, None, 2.5)) == ["<str:12>", "<int>", None, "<float>"]
+
+@pytest.mark.asyncio
+async def test_slow_statements_are_logged_with_their_plan(test_db, monkeypatch, caplog):
+    if "sqlite" not in engine.dialect.name:
+        pytest.skip("EXPLAIN QUERY PLAN is SQLite-specific")
+    # Every statement counts as slow
+    monkeypatch.setattr(slow_query_log, "threshold_ms", 1e-9)
+    monkeypatch.setattr(slow_query_log, "_plans", type(slow_query_log._plans)())
+    caplog.set_level(logging.WARNING, logger="app.core.slow_query")
+
+    async with ReadSessionLocal() as session:
+        repo = BookRepository(session)
+        explains = slow_query_log.explains
+        await repo.search_books(author="Confidential Author", year_min=1990, sort="year", count="none")
+        first = slow_query_log.explains - explains
+        await repo.search_books(author="Someone Else", year_min=2000, sort="year", count="none")
+        await repo.get_many([1, 2, 3])
+        await repo.get_many([4, 5])
+
+    assert first == 1
+    # Same shapes: the plans are reused, not explained again
+    assert slow_query_log.explains - explains == 2
+    messages = [record.getMessage() for record in caplog.records]
+    assert len(messages) == 4
+    assert "SEARCH books" in messages[0] or "SCAN books" in messages[0]
+    assert "Confidential Author" not in messages[0] and "<str:" in messages[0]
+    shapes = [re.search(r"shape=(\w+)", message).group(1) for message in messages]
+    assert shapes[0] == shapes[1] and shapes[2] == shapes[3]
+    assert "IN (?, ...)" in messages[2]
@@ -0,0 +1,28 @@
+import pytest
+from sqlalchemy import text
+
+from app.core.config import settings
+from app.core.database import engine
+from app.core.sqlite import SQLITE_PROFILES, sqlite_pragmas
+
+
+def test_profile_with_overrides(monkeypatch):
+    monkeypatch.setattr(settings, "SQLITE_SYNCHRONOUS", "OFF")
+    pragmas = sqlite_pragmas("throughput")
+    assert pragmas == {**SQLITE_PROFILES["throughput"], "synchronous": "OFF"}
+    assert sqlite_pragmas("") == {"synchronous": "OFF"}
+
+
+def test_unknown_profile():
+    with pytest.raises(ValueError):
+        sqlite_pragmas("fastest")
+
+
+@pytest.mark.asyncio
+async def test_connections_are_tuned():
+    expected = sqlite_pragmas()
+    async with engine.connect() as conn:
+        journal_mode = await conn.scalar(text("PRAGMA journal_mode"))
+        busy_timeout = await conn.scalar(text("PRAGMA busy_timeout"))
+    assert journal_mode.upper() == expected["journal_mode"]
+    assert busy_timeout == expected["busy_timeout"]
@@ -0,0 +1,139 @@
+import asyncio
+
+import pytest
+from sqlalchemy import event, text
+from sqlalchemy.exc import IntegrityError, OperationalError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
+
+from app.core.database import AsyncSessionLocal, ReadSessionLocal, engine, write_queue
+from app.core.writer import WriteQueue
+from app.repositories.book_repository import BookRepository
+
+
+@pytest.mark.asyncio
+async def test_write_burst_is_serialized(client):
+    async def create(i):
+        return await client.post("/api/v1/books/", json={"title": f"Burst {i}", "author": "Burst Writer"})
+
+    responses = await asyncio.gather(*(create(i) for i in range(50)))
+    assert [response.status_code for response in responses] == [201] * 50
+
+    listing = await client.get("/api/v1/books/", params={"author": "Burst Writer", "limit": 1})
+    assert listing.headers["X-Total-Count"] == "50"
+
+@pytest.mark.asyncio
+async def test_failed_job_does_not_affect_others(test_db):
+    async def fail(session):
+        await session.execute(text("INSERT INTO books (title, author, status) VALUES ('Rolled back', 'Queue', 'AVAILABLE')"))
+        raise ValueError("boom")
+
+    async def count(session):
+        return await session.scalar(text("SELECT count(*) FROM books WHERE author = 'Queue'"))
+
+    results = await asyncio.gather(write_queue.submit(fail), write_queue.submit(count), return_exceptions=True)
+    assert isinstance(results[0], ValueError)
+    assert results[1] == 0
+
+@pytest.mark.asyncio
+async def test_failed_rollback_does_not_stop_the_worker(test_db, caplog):
+    class LostConnectionSession(AsyncSession):
+        async def rollback(self):
+            raise OperationalError("ROLLBACK", {}, Exception("cannot rollback - connection lost"))
+
+    writer = WriteQueue(sessionmaker(bind=engine, class_=LostConnectionSession, expire_on_commit=False))
+
+    async def fail(session):
+        await session.execute(text("INSERT INTO books (title, author, status) VALUES ('Lost', 'Rollback', 'AVAILABLE')"))
+        raise ValueError("boom")
+
+    async def count(session):
+        return await session.scalar(text("SELECT count(*) FROM books WHERE author = 'Rollback'"))
+
+    # Before the fix the first future never settled and submit hung
+    results = await asyncio.wait_for(
+        asyncio.gather(writer.submit(fail), writer.submit(count), return_exceptions=True), timeout=5
+    )
+    assert isinstance(results[0], OperationalError)
+    assert results[1] == 0
+    assert "write batch" in caplog.text
+    assert await asyncio.wait_for(writer.submit(count), timeout=5) == 0
+    await writer.close()
+
+@pytest.mark.asyncio
+async def test_read_sessions_are_read_only(test_db):
+    if ReadSessionLocal.kw["bind"] is engine:
+        pytest.skip("reads and writes share one engine for this database")
+    async with ReadSessionLocal() as session:
+        with pytest.raises(OperationalError):
+            await session.execute(text("DELETE FROM books"))
+
+@pytest.mark.asyncio
+async def test_group_commit_isolates_errors(test_db):
+    writer = WriteQueue(AsyncSessionLocal, group_commit=True, group_window=0.05, group_max_ops=8)
+    repo = BookRepository(None, writer)
+    sessions = []
+
+    async def track(session):
+        # Rows written earlier in the group stay invisible until it commits
+        sessions.append(session)
+        async with ReadSessionLocal() as reader:
+            return await reader.scalar(text("SELECT count(*) FROM books WHERE author = 'Group Commit'"))
+
+    def book(i, isbn=None):
+        return {"title": f"Grouped {i}", "author": "Group Commit", "isbn": isbn}
+
+    results = await asyncio.gather(
+        repo.create(obj_in=book(0, "GC-1")),
+        repo.create(obj_in=book(1, "GC-1")),
+        writer.submit(track),
+        repo.create(obj_in=book(2)),
+        writer.submit(track),
+        return_exceptions=True,
+    )
+    await writer.close()
+
+    assert results[0].isbn == "GC-1" and results[3].id is not None
+    assert isinstance(results[1], IntegrityError)
+    assert results[2] == results[4] == 0
+    assert sessions[0] is sessions[1]  # one transaction for the whole group
+
+    async with ReadSessionLocal() as session:
+        titles = await session.scalars(text("SELECT title FROM books WHERE author = 'Group Commit' ORDER BY title"))
+        assert titles.all() == ["Grouped 0", "Grouped 2"]
+
+@pytest.mark.asyncio
+async def test_mutations_are_single_statements(test_db):
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if not statement.startswith(("BEGIN", "SAVEPOINT", "RELEASE")):
+            statements.append(statement.split()[0])
+
+    event.listen(engine.sync_engine, "before_cursor_execute", record)
+    try:
+        async with ReadSessionLocal() as session:
+            repo = BookRepository(session)
+            book = await repo.create(obj_in={"title": "Returning", "author": "One Statement"})
+            assert book.id and book.created_at and book.status == "available"
+            updated = await repo.update(db_obj=book, obj_in={"title": "Returning again"})
+            assert updated.title == "Returning again" and updated.updated_at is not None
+            assert statements == ["INSERT", "UPDATE"]
+
+            # A payload that changes nothing never reaches the writer
+            version = await repo.get_catalog_version()
+            assert await repo.update(db_obj=updated, obj_in={"title": "Returning again"}) is updated
+            assert statements == ["INSERT", "UPDATE"]
+            assert await repo.get_catalog_version() == version
+
+            # A stale snapshot: the stored row already holds the values, so it keeps its updated_at
+            same = await repo.update(db_obj=book, obj_in={"title": "Returning again"})
+            assert same.updated_at == updated.updated_at
+
+            statements.clear()
+            assert await repo.delete(id=book.id) is True
+            assert statements == ["DELETE"]
+            assert await repo.delete(id=book.id) is False
+            assert await repo.update(db_obj=book, obj_in={"title": "Gone"}) is None
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", record)